@@ -3,7 +3,7 @@ import os
 import sandbox
 
 if __name__ == '__main__':
-    league2.init()
+    league2.init(fast=True)
 
     settings = league2.Settings()
     settings.set_buffer_size(sandbox.GAME_SIZE)
@@ -1,3 +1,25 @@
-from league2.app import *
-import league2.assets
-import league2.gui
+import importlib
+
+# Importing pygame and every part of the engine takes a noticeable amount of time so nothing is imported until it
+# is first used. league2.Application, league2.gui, etc. all work as before, they are just loaded on demand.
+_SUBMODULES = ['app', 'assets', 'gui', 'scene', 'input', 'replay', 'audio', 'animation', 'camera', 'level', 'ecs',
+               'particles']
+# The public names of league2.app. They are listed here rather than looked up so that dir() and star imports don't
+# have to import anything.
+_APP_NAMES = ['Settings', 'Application', 'init', 'quit', 'run', 'get_startup_timings', 'get_settings_path',
+              'get_storage_path', 'get_executing_path']
+__all__ = _APP_NAMES + _SUBMODULES
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module('league2.' + name)
+    # Everything in league2.app is available straight from the package.
+    app = importlib.import_module('league2.app')
+    if not name.startswith('_') and hasattr(app, name):
+        return getattr(app, name)
+    raise AttributeError("module 'league2' has no attribute '%s'" % name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
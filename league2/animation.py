@@ -0,0 +1,144 @@
+import pygame
+import numpy
+import league2.assets
+
+
+class AnimationPlayer:
+    """
+    Plays a large number of animations at the same time. Rather than each object keeping track of its own timer
+    and frame, the player keeps the state of every animation in arrays and advances all of them at once with a
+    single update call each frame. Each playing animation is referred to by an integer handle.
+    """
+    def __init__(self, capacity: int = 256):
+        """
+        Create a new animation player.
+        :param capacity: How many animations to make room for up front. The player will grow if it runs out.
+        """
+        self.__times = numpy.zeros(capacity, dtype=numpy.float64)
+        self.__speeds = numpy.zeros(capacity, dtype=numpy.float64)
+        self.__clips = numpy.zeros(capacity, dtype=numpy.int32)
+        self.__indices = numpy.zeros(capacity, dtype=numpy.int32)
+        self.__free = list(range(capacity - 1, -1, -1))
+        # Every animation that has been played is added to one long timeline. Each animation gets its own stretch of
+        # the timeline so that the current frame of every animation can be found with one search.
+        self.__animations = {}
+        self.__frames = []
+        self.__ends = numpy.zeros(0, dtype=numpy.float64)
+        self.__clip_starts = numpy.zeros(0, dtype=numpy.float64)
+        self.__clip_lengths = numpy.zeros(0, dtype=numpy.float64)
+        self.__clip_first = numpy.zeros(0, dtype=numpy.int32)
+        self.__clip_last = numpy.zeros(0, dtype=numpy.int32)
+        self.__clip_loops = numpy.zeros(0, dtype=bool)
+
+    def __get_clip(self, animation):
+        key = id(animation)
+        if key in self.__animations:
+            return self.__animations[key][0]
+        # Keep a reference to the animation so that its id can't be reused by another animation.
+        clip = len(self.__animations)
+        self.__animations[key] = (clip, animation)
+        start = float(self.__ends[-1]) if len(self.__ends) > 0 else 0.0
+        first = len(self.__frames)
+        self.__frames.extend(animation.get_frames())
+        self.__ends = numpy.concatenate((self.__ends, numpy.array(animation.get_end_times()) + start))
+        self.__clip_starts = numpy.append(self.__clip_starts, start)
+        self.__clip_lengths = numpy.append(self.__clip_lengths, animation.get_length())
+        self.__clip_first = numpy.append(self.__clip_first, first)
+        self.__clip_last = numpy.append(self.__clip_last, len(self.__frames) - 1)
+        self.__clip_loops = numpy.append(self.__clip_loops, animation.is_looping())
+        return clip
+
+    def __grow(self):
+        old = len(self.__times)
+        new = max(old * 2, 1)
+        self.__times = numpy.resize(self.__times, new)
+        self.__speeds = numpy.resize(self.__speeds, new)
+        self.__clips = numpy.resize(self.__clips, new)
+        self.__indices = numpy.resize(self.__indices, new)
+        self.__speeds[old:] = 0
+        self.__free.extend(range(new - 1, old - 1, -1))
+
+    def add(self, animation: league2.assets.Animation, speed: float = 1.0) -> int:
+        """
+        Start playing an animation.
+        :param animation: The animation to play, usually from a sprite-sheet.
+        :param speed: How fast the animation plays. One is normal speed and zero is paused.
+        :return: A handle that is used to refer to the animation later.
+        """
+        if len(self.__free) == 0:
+            self.__grow()
+        handle = self.__free.pop()
+        self.play(handle, animation, speed)
+        return handle
+
+    def remove(self, handle: int):
+        """
+        Stop playing an animation. The handle may be given out again by the next call to add().
+        :param handle: The handle returned when the animation was added.
+        """
+        self.__speeds[handle] = 0
+        self.__free.append(handle)
+
+    def play(self, handle: int, animation: league2.assets.Animation, speed: float = 1.0):
+        """
+        Switch an existing handle to a different animation and start it from the beginning.
+        :param handle: The handle returned when the animation was added.
+        :param animation: The animation to play.
+        :param speed: How fast the animation plays. One is normal speed and zero is paused.
+        """
+        clip = self.__get_clip(animation)
+        self.__clips[handle] = clip
+        self.__times[handle] = 0
+        self.__speeds[handle] = speed
+        self.__indices[handle] = self.__clip_first[clip]
+
+    def set_speed(self, handle: int, speed: float):
+        """
+        Change how fast an animation plays.
+        :param handle: The handle returned when the animation was added.
+        :param speed: How fast the animation plays. One is normal speed and zero is paused.
+        """
+        self.__speeds[handle] = speed
+
+    def get_speed(self, handle: int) -> float:
+        """
+        How fast is an animation playing?
+        :param handle: The handle returned when the animation was added.
+        :return: The playback speed where one is normal speed.
+        """
+        return float(self.__speeds[handle])
+
+    def is_finished(self, handle: int) -> bool:
+        """
+        Has an animation that only plays once reached the end? Looping animations are never finished.
+        :param handle: The handle returned when the animation was added.
+        :return: True if the animation is done.
+        """
+        clip = self.__clips[handle]
+        return not self.__clip_loops[clip] and self.__times[handle] >= self.__clip_lengths[clip]
+
+    def get_frame(self, handle: int) -> pygame.Surface:
+        """
+        Get the frame that an animation is currently showing.
+        :param handle: The handle returned when the animation was added.
+        :return: The sub-surface to draw.
+        """
+        return self.__frames[self.__indices[handle]]
+
+    def update(self, frame_time: float):
+        """
+        Advance every animation at once. This should be called once per frame.
+        :param frame_time: The time, in seconds, that the last frame took.
+        """
+        if len(self.__frames) == 0:
+            return
+        self.__times += self.__speeds * frame_time
+        lengths = self.__clip_lengths[self.__clips]
+        # Looping animations wrap their time around so that it never grows without bound. Animations that only
+        # play once keep their time and are clamped to their last frame below.
+        loops = self.__clip_loops[self.__clips]
+        numpy.copyto(self.__times, numpy.fmod(self.__times, lengths), where=loops)
+        positions = self.__clip_starts[self.__clips] + self.__times
+        found = numpy.searchsorted(self.__ends, positions, side='right')
+        numpy.clip(found, self.__clip_first[self.__clips], self.__clip_last[self.__clips], out=self.__indices,
+                   casting='unsafe')
@@ -1,11 +1,30 @@
 import pygame
 import os
 import json
-import appdirs
 import league2.assets
 import league2.gui
+import league2.scene
+import league2.input
 import typing
 import abc
+import time
+
+
+# How long each part of starting the engine took in seconds, in the order they happened.
+_startup_timings = {}
+
+
+def _time_phase(phase: str, start: float):
+    _startup_timings[phase] = time.perf_counter() - start
+
+
+def get_startup_timings() -> typing.Dict[str, float]:
+    """
+    Get how long each phase of starting the engine took. This includes initializing pygame, creating the window,
+    starting to load assets and the time from creating the application until the first frame was shown.
+    :return: A dictionary of phase names and their time in seconds.
+    """
+    return dict(_startup_timings)
 
 
 def get_settings_path(app:  str, company: str) -> str:
@@ -15,6 +34,8 @@ def get_settings_path(app:  str, company: str) -> str:
     :param company: The name of the group that created the game.
     :return: A path that is guarantied to exist.
     """
+    # The appdirs module is only needed here so it isn't imported until a path is actually asked for.
+    import appdirs
     path = appdirs.user_config_dir(app, company)
     if not os.path.exists(path):
         os.makedirs(path)
@@ -29,6 +50,7 @@ def get_storage_path(app: str, company: str) -> str:
     :param company: The name of the group that created the game.
     :return: A path that is guarantied to exist.
     """
+    import appdirs
     path = appdirs.user_data_dir(app, company)
     if not os.path.exists(path):
         os.makedirs(path)
@@ -63,11 +85,13 @@ class Settings:
         self.__resizable = True
         self.__game_size = (640, 480)
         self.__size = self.__game_size
-        self.__native_size = pygame.display.Info().current_w, pygame.display.Info().current_h
+        # Asking the display for its size is slow so it is only done when running fullscreen needs it.
+        self.__native_size = None
         self.__use_native_size = True
         self.__fps = 40
         self.__asset_folder = '../assets'
         self.__preload_files = []
+        self.__load_all_assets = True
         self.__custom = {}
 
         # If there is no settings file then we will create one with the default settings.
@@ -92,6 +116,7 @@ class Settings:
         self.__fps = data['fps']
         self.__asset_folder = data['assets']
         self.__preload_files = data['preload']
+        self.__load_all_assets = data.get('load_all', True)
         self.__custom = data['custom']
 
     def save(self, fname: str):
@@ -107,6 +132,7 @@ class Settings:
             'fps': self.__fps,
             'assets': self.__asset_folder,
             'preload': self.__preload_files,
+            'load_all': self.__load_all_assets,
             'custom': self.__custom
         }
 
@@ -201,6 +227,8 @@ class Settings:
         :return: The size as a tuple.
         """
         if self.__fullscreen and self.__use_native_size:
+            if self.__native_size is None:
+                self.__native_size = pygame.display.get_desktop_sizes()[0]
             return self.__native_size
         else:
             return self.__size
@@ -261,6 +289,21 @@ class Settings:
         """
         return self.__preload_files
 
+    def set_load_all_assets(self, load_all: bool):
+        """
+        Choose whether every asset in the asset folder is loaded when the game starts. Large games can turn this
+        off so that only the preload files are loaded up front and the rest are loaded as scenes need them.
+        :param load_all: True to load every asset, False to only load the preload files.
+        """
+        self.__load_all_assets = load_all
+
+    def get_load_all_assets(self) -> bool:
+        """
+        Is every asset in the asset folder loaded when the game starts?
+        :return: True if every asset is loaded, False if only the preload files are.
+        """
+        return self.__load_all_assets
+
     def set_custom_setting(self, setting: str, data: typing.Union[int, float, bool, str]):
         """
         Set a custom setting for your game. It will be saved and loaded along with the other
@@ -301,20 +344,32 @@ class Application(abc.ABC):
         self.__settings = settings
         self.__assets = league2.assets.AssetManager(settings.get_asset_folder())
         self.__gui = None
+        self.__scenes = league2.scene.SceneManager(self.__assets)
+        self.__input = league2.input.Input()
+        self.__audio = None
         self.__clock = pygame.time.Clock()
+        self.__recorder = None
         self.__screen = None
         self.__buffer = pygame.Surface(self.__settings.get_buffer_size())
         self.__scaled_buffer = None
         self.__screen_dirty = []
 
-        self.__configure_screen(self.__settings.get_size())
+        self.__created = time.perf_counter()
+
+        # Applying the settings creates the window. It is only done once here since changing the display mode is
+        # one of the slowest parts of starting up.
+        start = time.perf_counter()
         self.apply_settings()
         self.__buffer.fill((100, 149, 237))
+        _time_phase('display', start)
 
         # Finally start loading assets. Assets will always automatically start to load
         # when the game starts. It is the game's responsibility to make sure that they
-        # are all loaded before doing anything.
-        self.__assets.start(self.__settings.get_preload_files())
+        # are all loaded before doing anything. When not every asset is loaded, the first
+        # scene that is pushed loads its own assets through the scene manager.
+        start = time.perf_counter()
+        self.__assets.start(self.__settings.get_preload_files(), load_all=self.__settings.get_load_all_assets())
+        _time_phase('assets', start)
 
     def __get_scaled_size(self):
         bx, by = self.__screen.get_size()
@@ -343,6 +398,13 @@ class Application(abc.ABC):
                 sy = by
         return int(sx), int(sy)
 
+    def __get_viewport(self):
+        # Figure out where to position the scaled buffer on the screen to put the bars in the right place.
+        scaled_width, scaled_height = self.__scaled_buffer.get_size()
+        screen_width, screen_height = self.__screen.get_size()
+        return pygame.Rect((screen_width - scaled_width) // 2, (screen_height - scaled_height) // 2,
+                           scaled_width, scaled_height)
+
     def __get_scaled_buffer(self):
         return pygame.Surface(self.__get_scaled_size())
 
@@ -378,6 +440,32 @@ class Application(abc.ABC):
         """
         return self.__assets
 
+    def get_audio(self) -> 'league2.audio.Audio':
+        """
+        Get the player for sound effects and music. It is created the first time it is asked for so that games
+        without sound don't need an audio device.
+        :return: The audio player object.
+        """
+        if self.__audio is None:
+            import league2.audio
+            self.__audio = league2.audio.Audio(self.__assets)
+        return self.__audio
+
+    def get_input(self) -> league2.input.Input:
+        """
+        Get the keyboard and mouse state for the current frame.
+        :return: The input snapshot that is updated at the start of every frame.
+        """
+        return self.__input
+
+    def get_scenes(self) -> league2.scene.SceneManager:
+        """
+        Get the scene manager for this game. Scenes are optional and the current scene is updated and drawn after
+        on_update() and on_draw() are called.
+        :return: The scene manager object.
+        """
+        return self.__scenes
+
     def set_root_gui_container(self, container: league2.gui.Container):
         """
         Set the root element and layout of the game's GUI.
@@ -402,7 +490,7 @@ class Application(abc.ABC):
         # if this is the game.
         if self.__settings.get_buffer_size() != self.__buffer.get_size():
             self.__buffer = pygame.Surface(self.__settings.get_buffer_size())
-        size = self.__screen.get_size()
+        size = self.__screen.get_size() if self.__screen is not None else self.__settings.get_size()
         # If we are going fullscreen we can't just use the same size again like we can for windowed mode because
         # the screen will be a different size. If the window is not resizable we will also use the size from the
         # settings.
@@ -422,6 +510,63 @@ class Application(abc.ABC):
         """
         return int(self.__clock.get_fps())
 
+    def record(self, fname: typing.Optional[str]):
+        """
+        Record the input and frame times of every frame to a file while the game runs. The recording can be played
+        back with replay() to reproduce the same session, for example to measure performance. Pass None to stop.
+        :param fname: The file to record to or None to stop recording.
+        """
+        if self.__recorder is not None:
+            self.__recorder.close()
+            self.__recorder = None
+        if fname is not None:
+            import league2.replay
+            self.__recorder = league2.replay.Recorder(fname)
+
+    def __frame(self, events, frame_time, mouse=None):
+        resize = None
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    self.__done = True
+            if event.type == pygame.QUIT:
+                self.__done = True
+            elif event.type == pygame.VIDEORESIZE:
+                # We don't want to handle the resize here because some window managers spam the resize
+                # event and it would result in us processing several slow resize event in a single frame. Just
+                # cache the size and wait until we processed them all.
+                resize = event.w, event.h
+        if resize is not None:
+            self.__configure_screen(resize)
+            resize = None
+        self.__input.update(events, self.__get_viewport(), self.__buffer.get_size(), mouse)
+
+        # Let the game handle updating and drawing it's state.
+        self.on_update(frame_time)
+        self.__scenes.update(frame_time)
+        self.on_draw(frame_time)
+        self.__scenes.draw(self.__buffer, frame_time)
+
+        # GUI is drawn at the end on top of everything else.
+        if self.__gui is not None:
+            self.__gui.render(self.__buffer, (0, 0, self.__buffer.get_width(), self.__buffer.get_height()))
+
+        # Scale our game up so that it fits nicely onto the screen without any stretching or showing more
+        # of the game. We scale up to preserve aspect ratio. This is one of the slower parts of the game
+        # because of the sheer amount of pixels that need to be scaled up.
+        pygame.transform.scale(self.__buffer, self.__get_scaled_size(), self.__scaled_buffer)
+        final_pos = self.__get_viewport().topleft
+
+        # Draw the finished result and present it on the screen. Since all drawing is done on the CPU, we need
+        # to preserve performance as much as possible. Rather than redrawing the screen every single frame, we
+        # keep track of the regions that changed this frame and only update those parts of the screen.
+        self.__screen_dirty.append(self.__screen.blit(self.__scaled_buffer, final_pos))
+        pygame.display.update(self.__screen_dirty)
+        self.__screen_dirty.clear()
+
+        if 'first_frame' not in _startup_timings:
+            _time_phase('first_frame', self.__created)
+
     def run(self):
         """
         Enters the main game loop and starts rendering and updating the game.
@@ -429,50 +574,42 @@ class Application(abc.ABC):
         self.on_start()
 
         while not self.__done:
-            resize = None
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        self.__done = True
-                if event.type == pygame.QUIT:
-                    self.__done = True
-                elif event.type == pygame.VIDEORESIZE:
-                    # We don't want to handle the resize here because some window managers spam the resize
-                    # event and it would result in us processing several slow resize event in a single frame. Just
-                    # cache the size and wait until we processed them all.
-                    resize = event.w, event.h
-            if resize is not None:
-                self.__configure_screen(resize)
-                resize = None
-
+            # Events are only taken from the queue here. Everything else, including the game, reads them from the
+            # input snapshot.
+            events = pygame.event.get()
             frame_time = self.__clock.tick(self.__settings.get_fps()) / 1000
+            self.__frame(events, frame_time)
+            if self.__recorder is not None:
+                self.__recorder.write(frame_time, events, self.__input.get_screen_mouse_position(),
+                                      self.__input.get_mouse_position())
+
+        self.record(None)
+        self.on_end()
+
+    def replay(self, fname: str, frame_time: typing.Optional[float] = None) -> typing.List[float]:
+        """
+        Run the game using the input recorded in a file instead of the keyboard and mouse. Frames are processed as
+        fast as possible and the frame time passed to the game comes from the recording rather than the clock, which
+        makes the replay behave the same every time. See league2.replay.replay() to run without a window.
+        :param fname: The file that was recorded with record().
+        :param frame_time: A fixed frame time, in seconds, to use for every frame instead of the recorded ones.
+        :return: The time, in seconds, that each frame took to process.
+        """
+        import league2.replay
+        timings = []
+        self.on_start()
 
-            # Let the game handle updating and drawing it's state.
-            self.on_update(frame_time)
-            self.on_draw(frame_time)
-
-            # GUI is drawn at the end on top of everything else.
-            if self.__gui is not None:
-                self.__gui.render(self.__buffer, (0, 0, self.__buffer.get_width(), self.__buffer.get_height()))
-
-            # Scale our game up so that it fits nicely onto the screen without any stretching or showing more
-            # of the game. We scale up to preserve aspect ratio. This is one of the slower parts of the game
-            # because of the sheer amount of pixels that need to be scaled up.
-            pygame.transform.scale(self.__buffer, self.__get_scaled_size(), self.__scaled_buffer)
-            # Now we need to figure out where to position the scaled buffer on the screen to put the
-            # bars in the right place.
-            scaled_width, scaled_height = self.__scaled_buffer.get_size()
-            screen_width, screen_height = self.__screen.get_size()
-            final_pos = ((screen_width - scaled_width) / 2, (screen_height - scaled_height) / 2)
-
-            # Draw the finished result and present it on the screen. Since all drawing is done on the CPU, we need
-            # to preserve performance as much as possible. Rather than redrawing the screen every single frame, we
-            # keep track of the regions that changed this frame and only update those parts of the screen.
-            self.__screen_dirty.append(self.__screen.blit(self.__scaled_buffer, final_pos))
-            pygame.display.update(self.__screen_dirty)
-            self.__screen_dirty.clear()
+        for recorded_time, events, mouse in league2.replay.Playback(fname):
+            if self.__done:
+                break
+            # The real event queue is still emptied so that it doesn't fill up while we aren't reading it.
+            pygame.event.clear()
+            start = time.perf_counter()
+            self.__frame(events, recorded_time if frame_time is None else frame_time, mouse)
+            timings.append(time.perf_counter() - start)
 
         self.on_end()
+        return timings
 
     @abc.abstractmethod
     def on_start(self):
@@ -507,11 +644,19 @@ class Application(abc.ABC):
         pass
 
 
-def init():
+def init(fast: bool = False):
     """
     Initialize the engine. This should be the very first thing called.
+    :param fast: Only initialize the display and fonts right away. Other parts of pygame, such as the mixer, are
+    initialized the first time that they are used which makes the game start faster.
     """
-    pygame.init()
+    start = time.perf_counter()
+    if fast:
+        pygame.display.init()
+        pygame.font.init()
+    else:
+        pygame.init()
+    _time_phase('init', start)
 
 
 def quit():
@@ -4,6 +4,19 @@ import os
 import json
 import typing
 import pathlib
+import io
+import collections
+import bisect
+import time
+
+
+def _make_mask(surface):
+    # Masks are stored along with the smallest rectangle that holds all of their set pixels. Collision checks can
+    # use the rectangle first and only fall back to the slower pixel test when the rectangles overlap.
+    mask = pygame.mask.from_surface(surface)
+    rects = mask.get_bounding_rects()
+    bounds = rects[0].unionall(rects[1:]) if len(rects) > 0 else pygame.Rect(0, 0, 0, 0)
+    return mask, bounds
 
 
 class TileSheet:
@@ -29,6 +42,14 @@ class TileSheet:
         # Rather than creating a new sub-surface any time that a particular tile is requested, it is
         # better to cache them here and return the same one.
         self.__cached = {}
+        self.__masks = {}
+
+    def get_surface(self) -> pygame.Surface:
+        """
+        Get the surface that holds every tile.
+        :return: The whole tile-sheet as a pygame surface.
+        """
+        return self.__surface
 
     def get_max_rows(self) -> int:
         """
@@ -61,6 +82,124 @@ class TileSheet:
             self.__cached[(row, column)] = self.__surface.subsurface((x, y, self.__cell_width, self.__cell_height))
         return self.__cached[(row, column)]
 
+    def build_masks(self):
+        """
+        Create a collision mask for every tile on the sheet. This is slow and is usually done by the asset manager on
+        the loading thread when the tile-sheet's JSON file asks for masks.
+        """
+        for row in range(self.__rows):
+            for column in range(self.__cols):
+                self.__masks[(row, column)] = _make_mask(self.get_tile(row, column))
+
+    def get_mask(self, row: int, column: int) -> pygame.mask.Mask:
+        """
+        Get the collision mask of a tile. The mask is created the first time it is asked for if build_masks() was
+        not called.
+        :param row: The row (starting at zero) to look at.
+        :param column: The column (starting at zero) to look at.
+        :return: A mask with a bit set for every solid pixel of the tile.
+        """
+        if (row, column) not in self.__masks:
+            self.__masks[(row, column)] = _make_mask(self.get_tile(row, column))
+        return self.__masks[(row, column)][0]
+
+    def get_mask_bounds(self, row: int, column: int) -> pygame.Rect:
+        """
+        Get the smallest rectangle, relative to the tile, that holds all the solid pixels of a tile.
+        :param row: The row (starting at zero) to look at.
+        :param column: The column (starting at zero) to look at.
+        :return: The bounding rectangle of the tile's mask.
+        """
+        self.get_mask(row, column)
+        return self.__masks[(row, column)][1]
+
+
+class Animation:
+    """
+    An animation is a named clip made of frames from a sprite-sheet. The frames are resolved into sub-surfaces when
+    the sheet is loaded so that playing an animation never has to look up sprites by name. Ping-pong animations are
+    unrolled ahead of time which means that an animation only ever has to loop or play once.
+    """
+    LOOP = 'loop'
+    ONCE = 'once'
+    PING_PONG = 'pingpong'
+
+    def __init__(self, frames: typing.Sequence[pygame.Surface], durations: typing.Sequence[float], loop: str = LOOP):
+        """
+        Create a new animation from a list of frames and how long each frame is shown for.
+        :param frames: The surfaces to show, in order.
+        :param durations: The time, in seconds, that each frame is shown for.
+        :param loop: One of Animation.LOOP, Animation.ONCE or Animation.PING_PONG.
+        """
+        if len(frames) == 0 or len(frames) != len(durations):
+            raise RuntimeError('An animation needs exactly one duration for each of its frames.')
+        if loop not in (Animation.LOOP, Animation.ONCE, Animation.PING_PONG):
+            raise RuntimeError('Unknown animation loop mode %s.' % loop)
+        frames = tuple(frames)
+        durations = tuple(durations)
+        if loop == Animation.PING_PONG:
+            # Going back and forth is the same as looping over the frames followed by the same frames in reverse
+            # without repeating the first and last frame.
+            frames = frames + frames[-2:0:-1]
+            durations = durations + durations[-2:0:-1]
+        self.__frames = frames
+        self.__durations = durations
+        self.__loops = loop != Animation.ONCE
+        # The time that each frame ends at is stored so that a frame can be found by searching on time alone.
+        ends = []
+        total = 0.0
+        for duration in durations:
+            total += duration
+            ends.append(total)
+        self.__ends = tuple(ends)
+
+    def get_frames(self) -> typing.Tuple[pygame.Surface, ...]:
+        """
+        Get all the frames in the order that they are played.
+        :return: A tuple of sub-surfaces.
+        """
+        return self.__frames
+
+    def get_durations(self) -> typing.Tuple[float, ...]:
+        """
+        Get how long each of the frames is shown for.
+        :return: A tuple of times in seconds.
+        """
+        return self.__durations
+
+    def get_end_times(self) -> typing.Tuple[float, ...]:
+        """
+        Get the time at which each frame stops being shown, measured from the start of the animation.
+        :return: A tuple of increasing times in seconds.
+        """
+        return self.__ends
+
+    def get_length(self) -> float:
+        """
+        How long does it take to play the animation a single time?
+        :return: The length in seconds.
+        """
+        return self.__ends[-1]
+
+    def is_looping(self) -> bool:
+        """
+        Does the animation start again from the beginning once it has finished?
+        :return: True if the animation loops.
+        """
+        return self.__loops
+
+    def get_frame(self, time: float) -> pygame.Surface:
+        """
+        Find the frame that should be shown after the animation has played for a certain amount of time. When
+        animating a lot of objects, use a league2.animation.AnimationPlayer instead.
+        :param time: The time since the animation started in seconds.
+        :return: The frame to display.
+        """
+        if self.__loops:
+            time %= self.get_length()
+        index = bisect.bisect_right(self.__ends, time)
+        return self.__frames[min(index, len(self.__frames) - 1)]
+
 
 class SpriteSheet:
     """
@@ -78,6 +217,15 @@ class SpriteSheet:
         self.__surface = surface
         self.__cached = {}
         self.__packed = {}
+        self.__animations = {}
+        self.__masks = {}
+
+    def get_surface(self) -> pygame.Surface:
+        """
+        Get the surface that holds every sprite.
+        :return: The whole sprite-sheet as a pygame surface.
+        """
+        return self.__surface
 
     def add_sprite(self, name: str, rect: pygame.Rect):
         """
@@ -99,6 +247,58 @@ class SpriteSheet:
             self.__cached[name] = self.__surface.subsurface(self.__packed[name])
         return self.__cached[name]
 
+    def build_masks(self):
+        """
+        Create a collision mask for every sprite on the sheet. This is slow and is usually done by the asset manager
+        on the loading thread when the sprite-sheet's JSON file asks for masks.
+        """
+        for name in self.__packed.keys():
+            self.__masks[name] = _make_mask(self.get_sprite(name))
+
+    def get_mask(self, name: str) -> pygame.mask.Mask:
+        """
+        Get the collision mask of a sprite. The mask is created the first time it is asked for if build_masks() was
+        not called.
+        :param name: The name of the sprite to look up.
+        :return: A mask with a bit set for every solid pixel of the sprite.
+        """
+        if name not in self.__masks:
+            self.__masks[name] = _make_mask(self.get_sprite(name))
+        return self.__masks[name][0]
+
+    def get_mask_bounds(self, name: str) -> pygame.Rect:
+        """
+        Get the smallest rectangle, relative to the sprite, that holds all the solid pixels of a sprite.
+        :param name: The name of the sprite to look up.
+        :return: The bounding rectangle of the sprite's mask.
+        """
+        self.get_mask(name)
+        return self.__masks[name][1]
+
+    def add_animation(self, name: str, frames: typing.List[str], durations: typing.Union[float, typing.List[float]],
+                      loop: str = Animation.LOOP) -> Animation:
+        """
+        Add a new animation made from sprites on this sheet. The sprites are looked up right away so they must have
+        been added to the sheet before the animation.
+        :param name: The unique name of the animation.
+        :param frames: The names of the sprites to play, in order.
+        :param durations: Either a single time, in seconds, for every frame or a list with a time for each frame.
+        :param loop: One of Animation.LOOP, Animation.ONCE or Animation.PING_PONG.
+        :return: The newly created animation.
+        """
+        if isinstance(durations, (int, float)):
+            durations = [durations] * len(frames)
+        self.__animations[name] = Animation([self.get_sprite(f) for f in frames], durations, loop)
+        return self.__animations[name]
+
+    def get_animation(self, name: str) -> Animation:
+        """
+        Find an animation on the sprite-sheet by its name.
+        :param name: The name of the animation to look up.
+        :return: The animation with all of its frames already resolved.
+        """
+        return self.__animations[name]
+
 
 class AssetManager:
     """
@@ -120,13 +320,37 @@ class AssetManager:
         self.__loaded_files = 0
         self.__files = []
         self.__cached_files = []
+        self.__index = None
+        self.__queue_lock = threading.Lock()
         self.__image_exts = ['.png', '.jpg', '.jpeg', '.bmp']
         self.__font_exts = ['.ttf']
-        self.__exts = self.__image_exts + self.__font_exts
+        self.__sound_exts = ['.wav', '.ogg']
+        self.__exts = self.__image_exts + self.__font_exts + self.__sound_exts
         self.__surfaces = {}
         self.__tilesheets = {}
         self.__spritesheets = {}
-        self.__fonts = {}
+        # Fonts are kept as raw bytes so that a single file on disk can be used at any point size. The actual
+        # pygame fonts are created on demand and kept in a small LRU cache keyed by name and size.
+        self.__font_data = {}
+        self.__font_sizes = {}
+        self.__fonts = collections.OrderedDict()
+        self.__font_cache_size = 16
+        # Sizes declared in a font's JSON file are kept outside of the LRU cache so they are never evicted.
+        self.__declared_fonts = {}
+        self.__font_lock = threading.Lock()
+        # Rotated, scaled, flipped and tinted copies of surfaces are cached so that they are only generated once.
+        # The cache is limited by the number of bytes of pixel data rather than by the number of surfaces.
+        self.__variants = collections.OrderedDict()
+        self.__variant_bytes = 0
+        self.__variant_budget = 32 * 1024 * 1024
+        self.__rotation_steps = {}
+        self.__variant_lock = threading.Lock()
+        self.__masks = {}
+        self.__sounds = {}
+        self.__music = {}
+        self.__sound_priorities = {}
+        self.__errors = {}
+        self.__image_modes = {}
 
     def __load(self):
         # This wait call is awful but it is needed because if we are starting to load and we just switched to
@@ -135,12 +359,58 @@ class AssetManager:
         # thread so the game can keep running.
         pygame.time.wait(100)
 
-        for fname in self.__files:
-            self.__load_file(fname)
-            self.__loaded_files += 1
-        # Finished loading!
-        self.__files.clear()
-        self.__finished = True
+        # More files can be queued by load() while we are working so keep going until the queue is empty. The
+        # check and marking the load as finished happen under one lock so that load() can't queue a file in between.
+        try:
+            while True:
+                with self.__queue_lock:
+                    if self.__loaded_files >= len(self.__files):
+                        # Finished loading!
+                        self.__files.clear()
+                        self.__loaded_files = 0
+                        self.__finished = True
+                        return
+                    fname = self.__files[self.__loaded_files]
+                # One broken asset shouldn't stop the rest from loading. The error is remembered and reported when
+                # the game asks for the asset.
+                try:
+                    self.__load_file(fname)
+                except Exception as e:
+                    self.__errors[self.__get_name(fname)] = str(e)
+                with self.__queue_lock:
+                    self.__loaded_files += 1
+        except BaseException:
+            # Loading is still marked as finished so that a new load can be started.
+            with self.__queue_lock:
+                self.__files.clear()
+                self.__loaded_files = 0
+                self.__finished = True
+            raise
+
+    def __check_error(self, name):
+        if name in self.__errors:
+            raise RuntimeError('Unable to load %s: %s' % (name, self.__errors[name]))
+
+    def __get_name(self, fname):
+        # Assets are looked up via their name but that name does not include the file
+        # extension. The name is also relative to the base asset directory.
+        n = os.path.splitext(pathlib.Path(fname).relative_to(self.__root))[0]
+        # Make sure to use a cross-platform name with cross-platform separators.
+        return n.replace('\\', '/')
+
+    def __scan(self):
+        # Find all the files in our asset folder that we can load and remember which file each asset name
+        # comes from so that assets can also be loaded one at a time.
+        files = []
+        self.__index = {}
+        for dname, dpath, fnames in os.walk(self.__root):
+            for fname in fnames:
+                # Only load files that have a compatible file extension.
+                if os.path.splitext(fname)[1] in self.__exts:
+                    path = os.path.join(dname, fname)
+                    files.append(path)
+                    self.__index[self.__get_name(path)] = path
+        return files
 
     def __fill_defaults(self, ext):
         # Base on the passed in file extension, we will try and guess the correct settings
@@ -156,23 +426,96 @@ class AssetManager:
                 'type': 'font',
                 'size': 12
             }
+        elif ext in self.__sound_exts:
+            return {
+                'type': 'sound',
+                'mode': 'preload'
+            }
         else:
             raise RuntimeError('Unknown asset type %s.' % ext)
 
+    def __convert_image(self, name, image, data):
+        mode = data.get('mode', 'default')
+        if mode not in ('default', 'auto', 'palette', 'colorkey', 'rle'):
+            raise IOError('Unknown image mode %s.' % mode)
+        if mode != 'default':
+            # Looking at every pixel is slow so it is only done when one of the special modes was asked for. The
+            # pixels are read as RGBA and each one is treated as a single 32-bit number.
+            pixels = memoryview(pygame.image.tobytes(image, 'RGBA')).cast('I')
+            colors = set(pixels)
+            alphas = set(c >> 24 for c in colors)
+            # A colour key can only stand in for alpha if every pixel is either fully opaque or fully transparent.
+            binary_alpha = alphas <= {0, 255}
+            transparent = 0 in alphas
+            opaque = set(c for c in colors if c >> 24 == 255)
+            if mode == 'auto':
+                if binary_alpha and len(opaque) + transparent <= 256:
+                    mode = 'palette'
+                elif binary_alpha and transparent:
+                    mode = 'rle'
+                else:
+                    mode = 'default'
+            elif mode == 'palette' and (not binary_alpha or len(opaque) + transparent > 256):
+                raise IOError('%s has too many colours or partial transparency for palette mode.' % name)
+            elif mode in ('colorkey', 'rle') and not binary_alpha:
+                if mode == 'colorkey':
+                    raise IOError('%s has partial transparency which a colour key can not represent.' % name)
+                # Run-length encoding also speeds up blitting surfaces with per-pixel alpha.
+                image = image.convert_alpha()
+                image.set_alpha(255, pygame.RLEACCEL)
+                self.__image_modes[name] = 'rle'
+                return image
+
+        if mode == 'default':
+            self.__image_modes[name] = 'alpha' if data['alpha'] else 'opaque'
+            # Each surface can have transparency enabled or disabled.
+            if data['alpha']:
+                return image.convert_alpha()
+            image = image.convert()
+            image.set_alpha(None)
+            return image
+
+        # Find a colour that no opaque pixel uses to stand in for the transparent pixels.
+        key = None
+        if transparent:
+            key = 0xFFFF00FF
+            while key in opaque:
+                key -= 1
+        self.__image_modes[name] = mode
+        if mode == 'palette':
+            palette = sorted(opaque) + ([key] if key is not None else [])
+            index = dict((c, i) for i, c in enumerate(palette))
+            for c in colors - opaque:
+                index[c] = len(palette) - 1
+            # Every pixel becomes one byte that refers to its colour in the palette.
+            result = pygame.image.frombytes(bytes(map(index.__getitem__, pixels)), image.get_size(), 'P')
+            result.set_palette([(c & 0xFF, (c >> 8) & 0xFF, (c >> 16) & 0xFF) for c in palette])
+            if key is not None:
+                result.set_colorkey(len(palette) - 1)
+            return result
+
+        # The transparent pixels are painted with the key colour before the alpha channel is thrown away.
+        result = image.convert()
+        result.set_alpha(None)
+        if key is not None:
+            key_color = pygame.Color(key & 0xFF, (key >> 8) & 0xFF, (key >> 16) & 0xFF)
+            hidden = pygame.mask.from_surface(image, 127)
+            hidden.invert()
+            hidden.to_surface(result, setcolor=key_color, unsetcolor=None)
+            result.set_colorkey(key_color, pygame.RLEACCEL if mode == 'rle' else 0)
+        elif mode == 'rle':
+            result.set_colorkey(None, pygame.RLEACCEL)
+        return result
+
     def __load_file(self, fname):
         # Some files may already have been loaded during preloading so make sure that
         # we don't load them again now.
         if fname in self.__cached_files:
             return
-        # Assets are looked up via their name but that name does not include the file
-        # extension. The name is also relative to the base asset directory.
-        n = os.path.splitext(pathlib.Path(fname).relative_to(self.__root))[0]
+        n = self.__get_name(fname)
         # Individual assets are loaded based on their file type.
         ext = os.path.splitext(fname)[1]
 
-        # Make sure to use a cross-platform name with cross-platform separators.
-        n = n.replace('\\', '/')
-
         self.__cached_files.append(fname)
 
         # Look for a JSON file that will contain asset settings. JSON files are only needed if an asset
@@ -184,40 +527,110 @@ class AssetManager:
             json_file.close()
         # Based on the asset type, load it correctly.
         if data['type'] == 'sprite':
-            self.__surfaces[n] = pygame.image.load(fname)
-            # Each surface can have transparency enabled or disabled.
-            if data['alpha']:
-                self.__surfaces[n] = self.__surfaces[n].convert_alpha()
-            else:
-                self.__surfaces[n] = self.__surfaces[n].convert()
-                self.__surfaces[n].set_alpha(None)
+            self.__surfaces[n] = self.__convert_image(n, pygame.image.load(fname), data)
+            # Pixel-perfect collision needs a mask which is slow to build so it is done here if it was asked for.
+            if data.get('mask', False):
+                self.__masks[n] = _make_mask(self.__surfaces[n])
+            # Sprites that are rotated a lot can ask for every rotation to be generated ahead of time. The number
+            # of rotations also decides how finely angles are rounded when asking for a variant later.
+            if 'rotations' in data:
+                self.__rotation_steps[n] = data['rotations']
+                for step in range(data['rotations']):
+                    for scale in data.get('scales', [1.0]):
+                        self.get_variant(n, step * 360.0 / data['rotations'], scale)
         elif data['type'] == 'tilesheet':
-            image = pygame.image.load(fname)
             # Like all visuals in league, transparency can be disabled for performance and often will
             # be for tile-maps.
-            if data['alpha']:
-                image = image.convert_alpha()
-            else:
-                image = image.convert()
-                image.set_alpha(None)
+            image = self.__convert_image(n, pygame.image.load(fname), data)
             self.__tilesheets[n] = TileSheet(image, data['rows'], data['columns'])
+            if data.get('mask', False):
+                self.__tilesheets[n].build_masks()
         elif data['type'] == 'spritesheet':
-            image = pygame.image.load(fname)
-            if data['alpha']:
-                image = image.convert_alpha()
-            else:
-                image = image.convert()
-                image.set_alpha(None)
+            image = self.__convert_image(n, pygame.image.load(fname), data)
             self.__spritesheets[n] = SpriteSheet(image)
             # All the child sprites are defined by a name in a list and a rectangle created from
             # an array of integers.
             for spr in data['sprites'].keys():
                 self.__spritesheets[n].add_sprite(spr, tuple(data['sprites'][spr]))
+            # Animations are optional and list the names of the sprites that make up each frame. They are
+            # resolved here on the loading thread so that the game never needs to look sprites up by name.
+            for anim, anim_data in data.get('animations', {}).items():
+                self.__spritesheets[n].add_animation(anim, anim_data['frames'], anim_data.get('duration', 0.1),
+                                                     anim_data.get('loop', Animation.LOOP))
+            if data.get('mask', False):
+                self.__spritesheets[n].build_masks()
+        elif data['type'] == 'sound':
+            # Short sound effects are decoded into memory so they play without delay. Long tracks such as music
+            # would use far too much memory that way so only their path is kept and they are streamed from disk.
+            if data.get('mode', 'preload') == 'stream':
+                self.__music[n] = fname
+            else:
+                # A game without sound shouldn't fail to load because there is no audio device or a sound can't
+                # be decoded. The error is remembered and reported if the game asks for the sound.
+                try:
+                    # The mixer isn't started by league2.init(fast=True) until something needs it.
+                    if pygame.mixer.get_init() is None:
+                        pygame.mixer.init()
+                    self.__sounds[n] = pygame.mixer.Sound(fname)
+                    self.__sounds[n].set_volume(data.get('volume', 1.0))
+                except pygame.error as e:
+                    self.__errors[n] = str(e)
+            self.__sound_priorities[n] = data.get('priority', 0)
         elif data['type'] == 'font':
-            self.__fonts[n] = pygame.font.Font(fname, data['size'])
+            with open(fname, 'rb') as font_file:
+                self.__font_data[n] = font_file.read()
+            self.__font_sizes[n] = data.get('size', 12)
+            # A font can declare the sizes it will be used at so that they are created ahead of time on the
+            # loading thread instead of the first time the game asks for them.
+            for size in data.get('sizes', [self.__font_sizes[n]]):
+                font = pygame.font.Font(io.BytesIO(self.__font_data[n]), size)
+                with self.__font_lock:
+                    self.__declared_fonts[(n, size)] = font
         else:
             raise IOError('Unidentified asset of type %s.' % data['type'])
 
+    def __get_font_instance(self, name, size):
+        key = (name, size)
+        with self.__font_lock:
+            if key in self.__declared_fonts:
+                return self.__declared_fonts[key]
+            if key in self.__fonts:
+                self.__fonts.move_to_end(key)
+                return self.__fonts[key]
+        # Parsing the font happens outside of the lock so that the game doesn't stall on the loading thread. Each
+        # font needs its own buffer because pygame keeps reading from it while the font is alive.
+        font = pygame.font.Font(io.BytesIO(self.__font_data[name]), size)
+        with self.__font_lock:
+            self.__fonts[key] = font
+            self.__fonts.move_to_end(key)
+            while len(self.__fonts) > self.__font_cache_size:
+                self.__fonts.popitem(last=False)
+        return font
+
+    def __make_variant(self, surface, angle, scale, flip, tint):
+        if flip[0] or flip[1]:
+            surface = pygame.transform.flip(surface, flip[0], flip[1])
+        if scale != 1.0:
+            size = max(1, round(surface.get_width() * scale)), max(1, round(surface.get_height() * scale))
+            surface = pygame.transform.scale(surface, size)
+        if angle != 0:
+            surface = pygame.transform.rotate(surface, angle)
+        if tint is not None:
+            # Blending only works on 32-bit pixels so palette images can't be tinted in place. A colour key would
+            # be tinted along with everything else and stop matching, so it is turned into alpha first.
+            if surface.get_colorkey() is not None or surface.get_flags() & pygame.SRCALPHA:
+                surface = surface.convert_alpha()
+            else:
+                surface = surface.convert(32)
+            surface.fill(tint, special_flags=pygame.BLEND_RGBA_MULT)
+        # The transforms don't always keep the display's pixel format so convert the result once here rather than
+        # having pygame convert it each time that it is drawn.
+        if surface.get_flags() & pygame.SRCALPHA:
+            return surface.convert_alpha()
+        surface = surface.convert()
+        surface.set_alpha(None)
+        return surface
+
     def set_root(self, root: str):
         """
         Change the base directory that assets are loaded from. Do not change during a load.
@@ -225,32 +638,34 @@ class AssetManager:
         """
         self.__root = root
 
-    def start(self, preload: typing.List[str], root: str = None):
+    def start(self, preload: typing.List[str], root: str = None, load_all: bool = True):
         """
         Asynchronously load all the assets in the root folder. Since some assets are required right away and
         can't be loaded on a separate thread, a list of assets to load on the main thread can also be provided.
         Those assets will be available as soon as this method returns.
         :param preload: A list of assets to load right away.
         :param root: Optionally provide a new root folder for assets to be found in.
+        :param load_all: If False, only the preload assets are loaded and everything else waits for load(), for
+        example when the first scene is pushed.
         """
         if not self.__finished:
             raise RuntimeError('Unable to start loading when a load is still in progress.')
 
         if root is not None:
             self.__root = root
-        # Find all the files in our asset folder that we can load.
-        for dname, dpath, files in os.walk(self.__root):
-            for fname in files:
-                # Only load files that have a compatible file extension. This
-                # will remember all the files that we have to load and they will
-                # later be loaded by the multi-threaded asset loader.
-                if os.path.splitext(fname)[1] in self.__exts:
-                    self.__files.append(os.path.join(dname, fname))
+        # This will remember all the files that we have to load and they will
+        # later be loaded by the multi-threaded asset loader. The folder is always scanned so that load() can
+        # find assets by name.
+        files = self.__scan()
+        if load_all:
+            self.__files.extend(files)
         # Usually the game will have some sort of loading screen which means that a few assets will need to be
         # loaded right away and not in a background thread. We can take care of that by having a list of assets
         # to load on the main thread rather than in the background.
         for fname in preload:
             self.__load_file(fname)
+        if len(self.__files) == 0:
+            return
         self.__finished = False
         threading.Thread(target=self.__load).start()
 
@@ -266,7 +681,89 @@ class AssetManager:
         Get the percentage of files loaded.
         :return: Returns 1 when complete and 0 if no files are loaded.
         """
-        return self.__loaded_files / len(self.__files)
+        with self.__queue_lock:
+            if len(self.__files) == 0:
+                return 1.0
+            return self.__loaded_files / len(self.__files)
+
+    def load(self, names: typing.List[str]) -> typing.List[str]:
+        """
+        Asynchronously load a list of assets by name. Unlike start(), this can be called while assets are still
+        being loaded and the new assets will be added to the end of the queue. Assets that are already loaded
+        or waiting to be loaded are skipped.
+        :param names: The names of the assets (without the extension) to load.
+        :return: The names of the assets that were added to the queue by this call.
+        """
+        if self.__index is None:
+            self.__scan()
+        queued = []
+        with self.__queue_lock:
+            # Only the files still waiting in the queue matter. A file that was already processed may have been
+            # released since and has to be queued again.
+            waiting = self.__files[self.__loaded_files:]
+            for name in names:
+                fname = self.__index[name]
+                if fname not in self.__cached_files and fname not in waiting:
+                    self.__files.append(fname)
+                    waiting.append(fname)
+                    queued.append(name)
+            if not self.__finished or self.__loaded_files >= len(self.__files):
+                return queued
+            self.__finished = False
+        threading.Thread(target=self.__load).start()
+        return queued
+
+    def is_loaded(self, name: str) -> bool:
+        """
+        Has a particular asset finished loading? Assets that failed to load count as loaded so that nothing waits
+        on them forever, but getting them will raise an error. See get_error().
+        :param name: The name of the asset (without the extension).
+        :return: True if the asset can be used.
+        """
+        return name in self.__surfaces or name in self.__tilesheets or name in self.__spritesheets or \
+            name in self.__font_data or name in self.__sounds or name in self.__music or name in self.__errors
+
+    def get_error(self, name: str) -> typing.Optional[str]:
+        """
+        Find out why an asset failed to load.
+        :param name: The name of the asset (without the extension).
+        :return: A description of the error or None if the asset didn't fail.
+        """
+        return self.__errors.get(name)
+
+    def release(self, names: typing.List[str]):
+        """
+        Forget about a list of assets so that their memory can be freed. Anything cached for the assets such as
+        masks, variants and fonts is released as well. The assets can be loaded again later with load().
+        :param names: The names of the assets (without the extension) to release.
+        """
+        for name in names:
+            if not self.is_loaded(name):
+                continue
+            self.__surfaces.pop(name, None)
+            self.__tilesheets.pop(name, None)
+            self.__spritesheets.pop(name, None)
+            self.__masks.pop(name, None)
+            self.__rotation_steps.pop(name, None)
+            self.__image_modes.pop(name, None)
+            self.__font_data.pop(name, None)
+            self.__font_sizes.pop(name, None)
+            self.__sounds.pop(name, None)
+            self.__music.pop(name, None)
+            self.__sound_priorities.pop(name, None)
+            self.__errors.pop(name, None)
+            with self.__font_lock:
+                for key in [k for k in self.__fonts.keys() if k[0] == name]:
+                    del self.__fonts[key]
+                for key in [k for k in self.__declared_fonts.keys() if k[0] == name]:
+                    del self.__declared_fonts[key]
+            with self.__variant_lock:
+                for key in [k for k in self.__variants.keys() if k[0] == name]:
+                    surface = self.__variants.pop(key)
+                    self.__variant_bytes -= surface.get_bytesize() * surface.get_width() * surface.get_height()
+            with self.__queue_lock:
+                if self.__index is not None and self.__index.get(name) in self.__cached_files:
+                    self.__cached_files.remove(self.__index[name])
 
     def get_surface(self, name: str) -> pygame.Surface:
         """
@@ -275,14 +772,92 @@ class AssetManager:
         :param name: The name of the asset (without the extension).
         :return: The cached pygame surface.
         """
+        self.__check_error(name)
         return self.__surfaces[name]
 
+    def get_mask(self, name: str) -> pygame.mask.Mask:
+        """
+        Find the collision mask of a surface. Masks are built on the loading thread for sprites whose JSON file sets
+        mask to true, otherwise the mask is built the first time it is asked for. For tiles and sprites on a sheet,
+        use the sheet's get_mask() instead.
+        :param name: The name of the asset (without the extension).
+        :return: A mask with a bit set for every solid pixel of the surface.
+        """
+        if name not in self.__masks:
+            self.__masks[name] = _make_mask(self.__surfaces[name])
+        return self.__masks[name][0]
+
+    def get_mask_bounds(self, name: str) -> pygame.Rect:
+        """
+        Get the smallest rectangle, relative to the surface, that holds all the solid pixels of a surface.
+        :param name: The name of the asset (without the extension).
+        :return: The bounding rectangle of the surface's mask.
+        """
+        self.get_mask(name)
+        return self.__masks[name][1]
+
+    def get_variant(self, name: str, angle: float = 0.0, scale: float = 1.0,
+                    flip: typing.Tuple[bool, bool] = (False, False),
+                    tint: typing.Optional[typing.Tuple[int, int, int, int]] = None) -> pygame.Surface:
+        """
+        Get a rotated, scaled, flipped and/or tinted copy of a surface. Variants are cached so that transforming a
+        surface every frame doesn't redo the pixel work or allocate new surfaces. Angles are rounded to the number of
+        rotations given in the asset's JSON file (or to the nearest degree) and scales to the nearest hundredth.
+        :param name: The name of the asset (without the extension).
+        :param angle: The counter-clockwise rotation in degrees.
+        :param scale: How much to scale the surface by.
+        :param flip: Whether to flip the surface horizontally and vertically.
+        :param tint: An optional colour that the surface's pixels are multiplied by.
+        :return: The cached variant of the surface.
+        """
+        steps = self.__rotation_steps.get(name, 360)
+        step = round(angle * steps / 360.0) % steps
+        scale = round(scale, 2)
+        if tint is not None:
+            tint = tuple(pygame.Color(tint))
+        key = (name, step, scale, flip[0], flip[1], tint)
+        with self.__variant_lock:
+            if key in self.__variants:
+                self.__variants.move_to_end(key)
+                return self.__variants[key]
+        surface = self.__make_variant(self.__surfaces[name], step * 360.0 / steps, scale, flip, tint)
+        with self.__variant_lock:
+            if key not in self.__variants:
+                self.__variants[key] = surface
+                self.__variant_bytes += surface.get_bytesize() * surface.get_width() * surface.get_height()
+            self.__trim_variants()
+            return self.__variants.get(key, surface)
+
+    def __trim_variants(self):
+        # Forget the least recently used variants until we are back under the memory budget. The newest variant is
+        # always kept even if it is bigger than the budget by itself.
+        while self.__variant_bytes > self.__variant_budget and len(self.__variants) > 1:
+            _, surface = self.__variants.popitem(last=False)
+            self.__variant_bytes -= surface.get_bytesize() * surface.get_width() * surface.get_height()
+
+    def set_variant_cache_size(self, size: int):
+        """
+        Set how much memory the cached surface variants may use before the least recently used ones are released.
+        :param size: The budget in bytes of pixel data.
+        """
+        with self.__variant_lock:
+            self.__variant_budget = size
+            self.__trim_variants()
+
+    def get_variant_cache_usage(self) -> int:
+        """
+        How much memory are the cached surface variants using?
+        :return: The size of their pixel data in bytes.
+        """
+        return self.__variant_bytes
+
     def get_tilesheet(self, name: str) -> TileSheet:
         """
         Find a tile-sheet that was automatically loaded.
         :param name: The name of the tile-sheet (without the extension).
         :return: The cached tile-sheet asset.
         """
+        self.__check_error(name)
         return self.__tilesheets[name]
 
     def get_spritesheet(self, name: str) -> SpriteSheet:
@@ -291,12 +866,83 @@ class AssetManager:
         :param name: The name of the sprite-sheet (without the extension).
         :return: The cached sprite-sheet asset.
         """
+        self.__check_error(name)
         return self.__spritesheets[name]
 
-    def get_font(self, name: str) -> pygame.font.Font:
+    def get_font(self, name: str, size: typing.Optional[int] = None) -> pygame.font.Font:
         """
-        Find a true-type font that was loaded.
+        Find a true-type font that was loaded. The font file is only loaded once and can be used at any size. Fonts
+        are created the first time a size is requested and the most recently used sizes are cached.
         :param name: The name of the font without the file extension.
+        :param size: The point size of the font. Defaults to the size given in the font's JSON file.
         :return: A font object that can be used to render surfaces.
         """
-        return self.__fonts[name]
+        self.__check_error(name)
+        if size is None:
+            size = self.__font_sizes[name]
+        return self.__get_font_instance(name, size)
+
+    def set_font_cache_size(self, count: int):
+        """
+        Set how many fonts (each name and size pair counts once) are kept around before the least recently used one
+        is released. Fonts that are still referenced by the game will not be freed until the game lets go of them.
+        The sizes declared in a font's JSON file are always kept and don't count towards this.
+        :param count: The maximum number of cached fonts.
+        """
+        with self.__font_lock:
+            self.__font_cache_size = count
+            while len(self.__fonts) > self.__font_cache_size:
+                self.__fonts.popitem(last=False)
+
+    def get_sound(self, name: str) -> pygame.mixer.Sound:
+        """
+        Find a sound effect that was decoded into memory. An error is raised if the sound could not be loaded, for
+        example because there is no audio device.
+        :param name: The name of the sound without the file extension.
+        :return: A sound that can be played right away.
+        """
+        self.__check_error(name)
+        return self.__sounds[name]
+
+    def get_music(self, name: str) -> str:
+        """
+        Find a sound that is streamed from disk rather than decoded into memory. Set the mode to stream in the
+        sound's JSON file for this.
+        :param name: The name of the sound without the file extension.
+        :return: The path of the file to stream with pygame.mixer.music.
+        """
+        self.__check_error(name)
+        return self.__music[name]
+
+    def get_sound_priority(self, name: str) -> int:
+        """
+        Get the priority given to a sound in its JSON file. Sounds with a higher priority can take over the channel
+        of a sound with a lower priority when every channel is busy.
+        :param name: The name of the sound without the file extension.
+        :return: The priority where zero is the default.
+        """
+        return self.__sound_priorities[name]
+
+    def get_image_report(self, blits: int = 20) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """
+        Measure every loaded sprite, tile-sheet and sprite-sheet. This is meant to help pick the mode in each asset's
+        JSON file and is slow since every surface is drawn several times.
+        :param blits: How many times to draw each surface when timing it.
+        :return: A dictionary of asset names to their mode, bytes of pixel data and average seconds per blit.
+        """
+        images = dict(self.__surfaces)
+        images.update((n, sheet.get_surface()) for n, sheet in self.__tilesheets.items())
+        images.update((n, sheet.get_surface()) for n, sheet in self.__spritesheets.items())
+        report = {}
+        for name, surface in images.items():
+            # Draw to a surface with the same format as the game's buffer so the timing matches real use.
+            target = pygame.Surface(surface.get_size()).convert()
+            start = time.perf_counter()
+            for i in range(blits):
+                target.blit(surface, (0, 0))
+            report[name] = {
+                'mode': self.__image_modes.get(name, 'unknown'),
+                'bytes': surface.get_pitch() * surface.get_height(),
+                'blit': (time.perf_counter() - start) / blits
+            }
+        return report
@@ -0,0 +1,134 @@
+import pygame
+import typing
+import league2.assets
+
+
+class Audio:
+    """
+    Plays sound effects and music. Sound effects are played on a fixed pool of channels and each playing sound has a
+    priority. When every channel is busy, a new sound takes over the channel of the oldest sound with a lower or equal
+    priority, or is not played at all if every playing sound is more important. Music is streamed from disk.
+    """
+    def __init__(self, assets: league2.assets.AssetManager, channels: int = 16):
+        """
+        Create the audio player. The mixer is initialized if league2.init() didn't already do it.
+        :param assets: The asset manager to get sounds and music from.
+        :param channels: How many sounds can play at the same time.
+        """
+        if pygame.mixer.get_init() is None:
+            try:
+                pygame.mixer.init()
+            except pygame.error:
+                raise RuntimeError('The mixer could not be initialized, is there an audio device?')
+        self.__assets = assets
+        pygame.mixer.set_num_channels(channels)
+        self.__channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self.__priorities = [0] * channels
+        self.__started = [0] * channels
+        self.__music = None
+
+    def play(self, name: str, priority: typing.Optional[int] = None, loops: int = 0,
+             volume: float = 1.0) -> typing.Optional[pygame.mixer.Channel]:
+        """
+        Play a sound effect that was loaded by the asset manager.
+        :param name: The name of the sound without the file extension.
+        :param priority: How important the sound is. Defaults to the priority in the sound's JSON file.
+        :param loops: How many times to repeat the sound after it is played once. Use -1 to repeat forever.
+        :param volume: The volume of the channel between zero and one.
+        :return: The channel that is playing the sound or None if no channel was available.
+        """
+        if priority is None:
+            priority = self.__assets.get_sound_priority(name)
+        return self.play_sound(self.__assets.get_sound(name), priority, loops, volume)
+
+    def play_sound(self, sound: pygame.mixer.Sound, priority: int = 0, loops: int = 0,
+                   volume: float = 1.0) -> typing.Optional[pygame.mixer.Channel]:
+        """
+        Play a sound effect on the channel pool.
+        :param sound: The sound to play.
+        :param priority: How important the sound is.
+        :param loops: How many times to repeat the sound after it is played once. Use -1 to repeat forever.
+        :param volume: The volume of the channel between zero and one.
+        :return: The channel that is playing the sound or None if no channel was available.
+        """
+        chosen = None
+        for i, channel in enumerate(self.__channels):
+            if not channel.get_busy():
+                chosen = i
+                break
+            # Steal from the least important sound and, out of those, the one that has been playing the longest
+            # since it is the most likely to be nearly finished.
+            if self.__priorities[i] <= priority:
+                if chosen is None or (self.__priorities[i], self.__started[i]) < \
+                        (self.__priorities[chosen], self.__started[chosen]):
+                    chosen = i
+        if chosen is None:
+            return None
+
+        channel = self.__channels[chosen]
+        channel.stop()
+        channel.set_volume(volume)
+        channel.play(sound, loops)
+        self.__priorities[chosen] = priority
+        self.__started[chosen] = pygame.time.get_ticks()
+        return channel
+
+    def stop_all(self, fade: float = 0.0):
+        """
+        Stop every sound effect. Music is not affected.
+        :param fade: How many seconds to fade the sounds out over.
+        """
+        for channel in self.__channels:
+            if fade > 0:
+                channel.fadeout(int(fade * 1000))
+            else:
+                channel.stop()
+
+    def play_music(self, name: str, loops: int = -1, fade: float = 0.0):
+        """
+        Start streaming a piece of music, replacing any music that is already playing. The sound must have its mode
+        set to stream in its JSON file.
+        :param name: The name of the sound without the file extension.
+        :param loops: How many times to repeat the music after it is played once. Defaults to forever.
+        :param fade: How many seconds to fade the music in over.
+        """
+        pygame.mixer.music.load(self.__assets.get_music(name))
+        pygame.mixer.music.play(loops, 0.0, int(fade * 1000))
+        self.__music = name
+
+    def stop_music(self, fade: float = 0.0):
+        """
+        Stop the music that is playing.
+        :param fade: How many seconds to fade the music out over.
+        """
+        if fade > 0:
+            pygame.mixer.music.fadeout(int(fade * 1000))
+        else:
+            pygame.mixer.music.stop()
+        self.__music = None
+
+    def pause_music(self):
+        """
+        Pause the music so that it can be resumed from the same spot.
+        """
+        pygame.mixer.music.pause()
+
+    def resume_music(self):
+        """
+        Resume music that was paused.
+        """
+        pygame.mixer.music.unpause()
+
+    def set_music_volume(self, volume: float):
+        """
+        Change the volume of the music.
+        :param volume: The volume between zero and one.
+        """
+        pygame.mixer.music.set_volume(volume)
+
+    def get_music(self) -> typing.Optional[str]:
+        """
+        Get the name of the music that was last started.
+        :return: The name of the music or None if no music is playing.
+        """
+        return self.__music
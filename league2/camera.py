@@ -0,0 +1,210 @@
+import pygame
+import abc
+import math
+import typing
+import league2.assets
+
+
+class Layer(abc.ABC):
+    """
+    A layer is part of the background of the game that the camera can draw a piece at a time. Layers are only asked
+    to draw the parts of the world that have just come into view, so they should be able to draw any rectangle of
+    the world rather than always drawing the whole thing.
+    """
+    @abc.abstractmethod
+    def render(self, surface: pygame.Surface, rect: pygame.Rect, world: pygame.Rect):
+        """
+        Draw part of the world onto a surface.
+        :param surface: The surface to draw to.
+        :param rect: The area of the surface to draw in. Nothing outside of it should be changed.
+        :param world: The area of the world, in pixels, that should be drawn. It is the same size as rect.
+        """
+        pass
+
+
+class TileLayer(Layer):
+    """
+    A layer made of tiles from a tile-sheet laid out on a grid. Each tile is stored as an index into the tile-sheet
+    where the index is row * columns + column. Negative indices are left empty.
+    """
+    def __init__(self, tilesheet: league2.assets.TileSheet, tiles: typing.Sequence[typing.Sequence[int]]):
+        """
+        Create a new layer of tiles.
+        :param tilesheet: The tile-sheet that the tiles are taken from.
+        :param tiles: A list of rows where each row is a list of tile indices.
+        """
+        self.__tilesheet = tilesheet
+        self.__tiles = tiles
+        first = tilesheet.get_tile(0, 0)
+        self.__tile_width = first.get_width()
+        self.__tile_height = first.get_height()
+
+    def get_tile_size(self) -> typing.Tuple[int, int]:
+        """
+        Get the size of a single tile in pixels.
+        :return: The width and height as a tuple.
+        """
+        return self.__tile_width, self.__tile_height
+
+    def render(self, surface: pygame.Surface, rect: pygame.Rect, world: pygame.Rect):
+        cols = self.__tilesheet.get_max_columns()
+        # Only the tiles that overlap the requested area are drawn and the clip keeps the tiles on the edge from
+        # drawing over pixels that are already correct.
+        first_col = max(0, world.left // self.__tile_width)
+        first_row = max(0, world.top // self.__tile_height)
+        last_col = (world.right - 1) // self.__tile_width
+        last_row = min(len(self.__tiles) - 1, (world.bottom - 1) // self.__tile_height)
+        old_clip = surface.get_clip()
+        surface.set_clip(rect)
+        blits = []
+        for row in range(first_row, last_row + 1):
+            line = self.__tiles[row]
+            y = rect.top + row * self.__tile_height - world.top
+            for col in range(first_col, min(len(line) - 1, last_col) + 1):
+                index = line[col]
+                if index < 0:
+                    continue
+                tile = self.__tilesheet.get_tile(index // cols, index % cols)
+                blits.append((tile, (rect.left + col * self.__tile_width - world.left, y)))
+        surface.blits(blits, False)
+        surface.set_clip(old_clip)
+
+
+class Camera:
+    """
+    A camera looks at part of the world and draws the background layers into a cached surface. When the camera
+    moves a short distance, the pixels that are still visible are shifted over with Surface.scroll() and only the
+    strips that came into view are drawn again. Large jumps simply redraw everything. Drawing the camera copies the
+    cached background onto the game's surface so that sprites can then be drawn on top of it as usual.
+    """
+    def __init__(self, size: typing.Tuple[int, int], layers: typing.Optional[typing.List[Layer]] = None):
+        """
+        Create a new camera.
+        :param size: The size of the view in pixels. This is usually the size of Application.get_surface().
+        :param layers: The background layers to draw, from back to front.
+        """
+        self.__layers = layers if layers is not None else []
+        self.__position = pygame.Vector2(0, 0)
+        self.__background = pygame.Surface(size)
+        self.__background.set_alpha(None)
+        self.__drawn = None
+        # Only moves smaller than this fraction of the view will reuse pixels. Past that point, the strips that need
+        # to be redrawn are so big that scrolling doesn't save much.
+        self.__scroll_limit = 0.5
+
+    def add_layer(self, layer: Layer):
+        """
+        Add a background layer in front of the existing ones. The whole view will be redrawn.
+        :param layer: The layer to add.
+        """
+        self.__layers.append(layer)
+        self.invalidate()
+
+    def remove_layer(self, layer: Layer):
+        """
+        Remove a background layer. The whole view will be redrawn.
+        :param layer: The layer to remove.
+        """
+        self.__layers.remove(layer)
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Redraw the whole view the next time the camera is drawn. Call this when a layer changes.
+        """
+        self.__drawn = None
+
+    def set_scroll_limit(self, limit: float):
+        """
+        Set how far the camera can move in a single frame, as a fraction of the view size, before it gives up on
+        reusing pixels and redraws everything.
+        :param limit: A fraction between zero and one.
+        """
+        self.__scroll_limit = limit
+
+    def get_position(self) -> pygame.Vector2:
+        """
+        Get the position of the top-left corner of the view in the world.
+        :return: The position in pixels.
+        """
+        return pygame.Vector2(self.__position)
+
+    def set_position(self, position: typing.Union[pygame.Vector2, typing.Tuple[float, float]]):
+        """
+        Move the top-left corner of the view to a position in the world.
+        :param position: The position in pixels.
+        """
+        self.__position.update(position)
+
+    def move(self, offset: typing.Union[pygame.Vector2, typing.Tuple[float, float]]):
+        """
+        Move the camera relative to where it is now.
+        :param offset: The distance to move in pixels.
+        """
+        self.__position += pygame.Vector2(offset)
+
+    def get_view(self) -> pygame.Rect:
+        """
+        Get the area of the world that is currently in view.
+        :return: A rectangle in world pixels.
+        """
+        x, y = math.floor(self.__position.x), math.floor(self.__position.y)
+        return pygame.Rect(x, y, self.__background.get_width(), self.__background.get_height())
+
+    def world_to_screen(self, position: typing.Union[pygame.Vector2, typing.Tuple[float, float]]) -> pygame.Vector2:
+        """
+        Convert a position in the world to a position on the game's surface.
+        :param position: The position in world pixels.
+        :return: The position on the surface.
+        """
+        view = self.get_view()
+        return pygame.Vector2(position[0] - view.x, position[1] - view.y)
+
+    def screen_to_world(self, position: typing.Union[pygame.Vector2, typing.Tuple[float, float]]) -> pygame.Vector2:
+        """
+        Convert a position on the game's surface to a position in the world.
+        :param position: The position on the surface.
+        :return: The position in world pixels.
+        """
+        view = self.get_view()
+        return pygame.Vector2(position[0] + view.x, position[1] + view.y)
+
+    def __draw_area(self, rect, view):
+        if rect.width <= 0 or rect.height <= 0:
+            return
+        world = pygame.Rect(view.x + rect.x, view.y + rect.y, rect.width, rect.height)
+        self.__background.fill((0, 0, 0), rect)
+        for layer in self.__layers:
+            layer.render(self.__background, rect, world)
+
+    def render(self, surface: pygame.Surface):
+        """
+        Draw the background layers onto a surface. Call this at the start of Application.on_draw() before drawing
+        anything else.
+        :param surface: The surface to draw to, usually Application.get_surface().
+        """
+        if surface.get_size() != self.__background.get_size():
+            # The game's buffer changed size so nothing we have cached is useful any more.
+            self.__background = pygame.Surface(surface.get_size())
+            self.__background.set_alpha(None)
+            self.__drawn = None
+
+        view = self.get_view()
+        width, height = self.__background.get_size()
+        if self.__drawn is None:
+            self.__draw_area(pygame.Rect(0, 0, width, height), view)
+        else:
+            dx = view.x - self.__drawn.x
+            dy = view.y - self.__drawn.y
+            if abs(dx) > width * self.__scroll_limit or abs(dy) > height * self.__scroll_limit:
+                self.__draw_area(pygame.Rect(0, 0, width, height), view)
+            elif dx != 0 or dy != 0:
+                self.__background.scroll(-dx, -dy)
+                # The columns that came into view take up the full height and the rows that came into view only
+                # cover what the columns didn't so that no pixel is drawn twice.
+                cols = pygame.Rect(width - dx if dx > 0 else 0, 0, abs(dx), height)
+                rows = pygame.Rect(0 if dx > 0 else -dx, height - dy if dy > 0 else 0, width - abs(dx), abs(dy))
+                self.__draw_area(cols, view)
+                self.__draw_area(rows, view)
+        self.__drawn = view
+        surface.blit(self.__background, (0, 0))
@@ -0,0 +1,261 @@
+import numpy
+import heapq
+import abc
+import typing
+
+
+# Each contiguous run of matching entities is worked on with its own slice. If the runs are shorter than this on
+# average, the Python overhead of a slice per run costs more than indexing with an array of ids.
+_MIN_RUN_LENGTH = 256
+
+
+class System(abc.ABC):
+    """
+    A system holds the game logic for entities that have a certain set of components. Rather than being called
+    once per entity, a system is called once per frame and works on every matching entity at once using array
+    operations.
+    """
+    @abc.abstractmethod
+    def on_update(self, world: 'World', frame_time: float):
+        """
+        Called once per frame by the world to update the entities.
+        :param world: The world that the system belongs to.
+        :param frame_time: The time, in seconds, that the last frame took.
+        """
+        pass
+
+
+class World:
+    """
+    Stores entities and their components. An entity is only an integer index and each component is stored as a
+    single array with one element per entity. This keeps the data for many entities next to each other in memory
+    which allows systems to update all of them with a few NumPy operations instead of a Python loop.
+    """
+    def __init__(self, capacity: int = 1024):
+        """
+        Create a new, empty world.
+        :param capacity: How many entities to make room for up front. The world will grow if it runs out.
+        """
+        self.__capacity = capacity
+        self.__alive = numpy.zeros(capacity, dtype=bool)
+        # Destroyed entities are put on the free list so their index can be reused by the next entity. The free list
+        # is a heap so the lowest id is always reused first which keeps the living entities packed together.
+        self.__free = list(range(capacity))
+        self.__components = {}
+        self.__has = {}
+        self.__systems = []
+        # Queries are cached until an entity gains or loses a component since that is the only time they change.
+        self.__queries = {}
+
+    def __grow(self):
+        old = self.__capacity
+        self.__capacity = max(old * 2, 1)
+        added = self.__capacity - old
+        self.__alive = numpy.concatenate((self.__alive, numpy.zeros(added, dtype=bool)))
+        for name, array in self.__components.items():
+            grown = numpy.zeros((self.__capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[:old] = array
+            self.__components[name] = grown
+            self.__has[name] = numpy.concatenate((self.__has[name], numpy.zeros(added, dtype=bool)))
+        # The new ids are all larger than the ones already free so adding them in order keeps the heap valid.
+        self.__free.extend(range(old, self.__capacity))
+
+    def register_component(self, name: str, dtype: typing.Any = numpy.float32, shape: typing.Tuple[int, ...] = ()):
+        """
+        Add a new type of component to the world. Every entity gets room for the component but only the entities that
+        it is added to will show up in queries for it.
+        :param name: The unique name of the component.
+        :param dtype: The NumPy type of the data, such as numpy.float32.
+        :param shape: The shape of the data for a single entity, for example (2,) for a position.
+        """
+        if name in self.__components:
+            raise RuntimeError('The component %s is already registered.' % name)
+        self.__components[name] = numpy.zeros((self.__capacity,) + tuple(shape), dtype=dtype)
+        self.__has[name] = numpy.zeros(self.__capacity, dtype=bool)
+
+    def create(self, **components) -> int:
+        """
+        Create a new entity. Components can be added right away by passing them as keyword arguments.
+        :param components: The initial values of the components to add to the entity.
+        :return: The id of the new entity.
+        """
+        if len(self.__free) == 0:
+            self.__grow()
+        entity = heapq.heappop(self.__free)
+        self.__alive[entity] = True
+        for name, value in components.items():
+            self.add(entity, name, value)
+        return entity
+
+    def destroy(self, entity: int):
+        """
+        Remove an entity and all of its components. The id may be given to the next entity that is created.
+        :param entity: The id of the entity.
+        """
+        if not self.__alive[entity]:
+            return
+        self.__alive[entity] = False
+        # The data is cleared as well so that an entity given the same id later doesn't start with old values.
+        for name, has in self.__has.items():
+            has[entity] = False
+            self.__components[name][entity] = 0
+        self.__queries.clear()
+        heapq.heappush(self.__free, entity)
+
+    def is_alive(self, entity: int) -> bool:
+        """
+        Does an entity exist?
+        :param entity: The id of the entity.
+        :return: True if the entity has not been destroyed.
+        """
+        return bool(self.__alive[entity])
+
+    def add(self, entity: int, name: str, value: typing.Any = None):
+        """
+        Add a component to an entity.
+        :param entity: The id of the entity.
+        :param name: The name of the component.
+        :param value: The initial value of the component. If not given, the value is zero.
+        """
+        self.__components[name][entity] = 0 if value is None else value
+        if not self.__has[name][entity]:
+            self.__has[name][entity] = True
+            self.__queries.clear()
+
+    def remove(self, entity: int, name: str):
+        """
+        Remove a component from an entity.
+        :param entity: The id of the entity.
+        :param name: The name of the component.
+        """
+        if self.__has[name][entity]:
+            self.__has[name][entity] = False
+            self.__queries.clear()
+
+    def has(self, entity: int, name: str) -> bool:
+        """
+        Does an entity have a component?
+        :param entity: The id of the entity.
+        :param name: The name of the component.
+        :return: True if the entity has the component.
+        """
+        return bool(self.__has[name][entity])
+
+    def get(self, entity: int, name: str) -> typing.Any:
+        """
+        Get the value of a single entity's component. Systems should use get_component() and query() instead.
+        :param entity: The id of the entity.
+        :param name: The name of the component.
+        :return: The value of the component.
+        """
+        return self.__components[name][entity]
+
+    def get_component(self, name: str) -> numpy.ndarray:
+        """
+        Get the array that holds a component for every entity. Index it with the result of query() to work on the
+        matching entities. The array is replaced when the world grows so don't keep it between frames.
+        :param name: The name of the component.
+        :return: The array of component data indexed by entity id.
+        """
+        return self.__components[name]
+
+    def __find(self, key):
+        if key not in self.__queries:
+            mask = self.__alive.copy()
+            for name in key:
+                mask &= self.__has[name]
+            ids = numpy.flatnonzero(mask)
+            if len(ids) == 0:
+                self.__queries[key] = (ids, [])
+                return self.__queries[key]
+            # Split the ids wherever there is a gap to find the runs of entities that sit next to each other.
+            gaps = numpy.flatnonzero(numpy.diff(ids) != 1)
+            starts = ids[numpy.concatenate(([0], gaps + 1))].tolist()
+            ends = ids[numpy.concatenate((gaps, [len(ids) - 1]))].tolist()
+            runs = [slice(a, b + 1) for a, b in zip(starts, ends)]
+            # Entities are usually created in one go and the lowest free id is reused first which makes a single
+            # run common. Slicing a NumPy array doesn't have to copy it.
+            if len(runs) == 1:
+                ids = runs[0]
+            elif len(runs) > len(ids) // _MIN_RUN_LENGTH:
+                runs = [ids]
+            self.__queries[key] = (ids, runs)
+        return self.__queries[key]
+
+    def query(self, *names: str) -> typing.Union[numpy.ndarray, slice]:
+        """
+        Find all the entities that have every one of the components given. If the matching ids are one contiguous
+        range with no gaps, a slice is returned instead of an array of ids since slicing a NumPy array doesn't have to
+        copy it.
+        :param names: The names of the components that the entities must have.
+        :return: The ids of the matching entities that can be used to index component arrays.
+        """
+        return self.__find(tuple(sorted(names)))[0]
+
+    def query_runs(self, *names: str) -> typing.List[typing.Union[numpy.ndarray, slice]]:
+        """
+        Find all the entities that have every one of the components given, split into groups that can each be used
+        to index component arrays. A few gaps, such as from a destroyed entity, only split the matches into a few
+        slices which keeps systems from having to copy the data. When the matches are scattered, a single array of
+        ids is returned instead.
+        :param names: The names of the components that the entities must have.
+        :return: A list of slices or a list holding one array of ids. The list is empty if nothing matches.
+        """
+        return self.__find(tuple(sorted(names)))[1]
+
+    def count(self, *names: str) -> int:
+        """
+        Count the entities that have every one of the components given.
+        :param names: The names of the components that the entities must have.
+        :return: The number of matching entities.
+        """
+        ids = self.query(*names)
+        if isinstance(ids, slice):
+            return ids.stop - ids.start
+        return len(ids)
+
+    def add_system(self, system: System, priority: int = 0):
+        """
+        Add a system to the world. Systems run in order of priority, lowest first, and in the order they were added
+        when the priority is the same.
+        :param system: The system to run each frame.
+        :param priority: When the system runs compared to the others.
+        """
+        self.__systems.append((priority, len(self.__systems), system))
+        self.__systems.sort(key=lambda s: (s[0], s[1]))
+
+    def remove_system(self, system: System):
+        """
+        Stop running a system.
+        :param system: The system to remove.
+        """
+        self.__systems = [s for s in self.__systems if s[2] is not system]
+
+    def update(self, frame_time: float):
+        """
+        Run every system once. This should be called each frame, usually from Application.on_update().
+        :param frame_time: The time, in seconds, that the last frame took.
+        """
+        for priority, order, system in list(self.__systems):
+            system.on_update(self, frame_time)
+
+
+class MovementSystem(System):
+    """
+    Moves every entity that has a position and velocity component by its velocity. Both components must hold the
+    same number of values per entity, for example numpy.float32 with a shape of (2,).
+    """
+    def __init__(self, position: str = 'position', velocity: str = 'velocity'):
+        """
+        Create a new movement system.
+        :param position: The name of the position component.
+        :param velocity: The name of the velocity component.
+        """
+        self.__position = position
+        self.__velocity = velocity
+
+    def on_update(self, world: World, frame_time: float):
+        position = world.get_component(self.__position)
+        velocity = world.get_component(self.__velocity)
+        for ids in world.query_runs(self.__position, self.__velocity):
+            position[ids] += velocity[ids] * frame_time
@@ -0,0 +1,238 @@
+import pygame
+import typing
+
+
+class Input:
+    """
+    A snapshot of the keyboard and mouse that is taken once per frame by the application. Games can ask about
+    the state of any key, mouse button or action as many times as they want without touching pygame's event queue.
+    Event types that the engine doesn't use are blocked so that they never fill up the queue in the first place.
+    """
+    # Mouse motion is the noisiest event by far and the mouse position is read directly instead, so it is not
+    # in this list.
+    DEFAULT_EVENTS = [pygame.QUIT, pygame.VIDEORESIZE, pygame.KEYDOWN, pygame.KEYUP,
+                      pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL]
+
+    def __init__(self):
+        """
+        Create a new input snapshot and block every event type that isn't needed.
+        """
+        self.__allowed = list(Input.DEFAULT_EVENTS)
+        self.__keys_down = pygame.key.get_pressed()
+        self.__keys_pressed = set()
+        self.__keys_released = set()
+        self.__buttons_down = (False, False, False, False, False)
+        self.__buttons_pressed = set()
+        self.__buttons_released = set()
+        # While playing back a recording, the keyboard and mouse can't be asked for their state so it is worked
+        # out from the recorded events instead.
+        self.__playback = False
+        self.__keys_held = set()
+        self.__buttons_held = set()
+        self.__wheel = (0, 0)
+        self.__mouse = pygame.Vector2(0, 0)
+        self.__screen_mouse = (0, 0)
+        self.__actions = {}
+        self.__events = []
+        self.__apply_filter()
+
+    def __apply_filter(self):
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(self.__allowed)
+
+    def allow_event(self, event_type: int):
+        """
+        Stop blocking a type of event. Events that the engine doesn't handle itself can be read with get_events().
+        :param event_type: The pygame event type, for example pygame.TEXTINPUT.
+        """
+        if event_type not in self.__allowed:
+            self.__allowed.append(event_type)
+            self.__apply_filter()
+
+    def block_event(self, event_type: int):
+        """
+        Block a type of event so it is never put on the event queue.
+        :param event_type: The pygame event type, for example pygame.MOUSEWHEEL.
+        """
+        if event_type in self.__allowed:
+            self.__allowed.remove(event_type)
+            self.__apply_filter()
+
+    def update(self, events: typing.List[pygame.event.Event], viewport: pygame.Rect,
+               buffer_size: typing.Tuple[int, int],
+               mouse: typing.Optional[typing.Tuple[typing.Tuple[int, int], pygame.Vector2]] = None):
+        """
+        Take a new snapshot of the input. This is called by the application once per frame.
+        :param events: The events taken from the queue this frame.
+        :param viewport: Where the game's buffer is drawn on the screen after it has been scaled.
+        :param buffer_size: The size of the game's buffer.
+        :param mouse: When playing back a recording, the recorded mouse position in the window and in the game.
+        """
+        self.__keys_pressed.clear()
+        self.__keys_released.clear()
+        self.__buttons_pressed.clear()
+        self.__buttons_released.clear()
+        self.__wheel = (0, 0)
+        self.__events = events
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                self.__keys_pressed.add(event.key)
+                self.__keys_held.add(event.key)
+            elif event.type == pygame.KEYUP:
+                self.__keys_released.add(event.key)
+                self.__keys_held.discard(event.key)
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                self.__buttons_pressed.add(event.button)
+                self.__buttons_held.add(event.button)
+            elif event.type == pygame.MOUSEBUTTONUP:
+                self.__buttons_released.add(event.button)
+                self.__buttons_held.discard(event.button)
+            elif event.type == pygame.MOUSEWHEEL:
+                self.__wheel = (self.__wheel[0] + event.x, self.__wheel[1] + event.y)
+
+        self.__playback = mouse is not None
+        if self.__playback:
+            self.__screen_mouse = mouse[0]
+            self.__mouse.update(mouse[1])
+            return
+        self.__keys_down = pygame.key.get_pressed()
+        self.__buttons_down = pygame.mouse.get_pressed(5)
+
+        # The game is drawn scaled up with black bars around it so the mouse has to be mapped back into the
+        # game's own coordinates.
+        self.__screen_mouse = pygame.mouse.get_pos()
+        if viewport.width > 0 and viewport.height > 0:
+            self.__mouse.x = (self.__screen_mouse[0] - viewport.x) * buffer_size[0] / viewport.width
+            self.__mouse.y = (self.__screen_mouse[1] - viewport.y) * buffer_size[1] / viewport.height
+
+    def get_events(self) -> typing.List[pygame.event.Event]:
+        """
+        Get all the events that were taken from the queue this frame.
+        :return: A list of pygame events.
+        """
+        return self.__events
+
+    def is_key_down(self, key: int) -> bool:
+        """
+        Is a key being held down?
+        :param key: The pygame key constant, for example pygame.K_SPACE.
+        :return: True if the key is down.
+        """
+        if self.__playback:
+            return key in self.__keys_held
+        return self.__keys_down[key]
+
+    def is_key_pressed(self, key: int) -> bool:
+        """
+        Was a key pressed this frame?
+        :param key: The pygame key constant, for example pygame.K_SPACE.
+        :return: True if the key went down since the last frame.
+        """
+        return key in self.__keys_pressed
+
+    def is_key_released(self, key: int) -> bool:
+        """
+        Was a key released this frame?
+        :param key: The pygame key constant, for example pygame.K_SPACE.
+        :return: True if the key went up since the last frame.
+        """
+        return key in self.__keys_released
+
+    def is_button_down(self, button: int) -> bool:
+        """
+        Is a mouse button being held down?
+        :param button: The mouse button where one is the left button, two the middle and three the right.
+        :return: True if the button is down.
+        """
+        if self.__playback:
+            return button in self.__buttons_held
+        return 0 < button <= len(self.__buttons_down) and self.__buttons_down[button - 1]
+
+    def is_button_pressed(self, button: int) -> bool:
+        """
+        Was a mouse button pressed this frame?
+        :param button: The mouse button where one is the left button, two the middle and three the right.
+        :return: True if the button went down since the last frame.
+        """
+        return button in self.__buttons_pressed
+
+    def is_button_released(self, button: int) -> bool:
+        """
+        Was a mouse button released this frame?
+        :param button: The mouse button where one is the left button, two the middle and three the right.
+        :return: True if the button went up since the last frame.
+        """
+        return button in self.__buttons_released
+
+    def get_mouse_position(self) -> pygame.Vector2:
+        """
+        Get the position of the mouse in the game's coordinates. The position can be outside of the game's buffer
+        when the mouse is over the black bars.
+        :return: The position in pixels of the game's buffer.
+        """
+        return pygame.Vector2(self.__mouse)
+
+    def get_screen_mouse_position(self) -> typing.Tuple[int, int]:
+        """
+        Get the position of the mouse in the window.
+        :return: The position in pixels of the window.
+        """
+        return self.__screen_mouse
+
+    def get_mouse_wheel(self) -> typing.Tuple[int, int]:
+        """
+        How far was the mouse wheel scrolled this frame?
+        :return: The horizontal and vertical scroll amount.
+        """
+        return self.__wheel
+
+    def bind(self, action: str, key: int):
+        """
+        Bind a key to a named action such as 'jump'. An action can have more than one key bound to it.
+        :param action: The name of the action.
+        :param key: The pygame key constant, for example pygame.K_SPACE.
+        """
+        self.__actions.setdefault(action, []).append(key)
+
+    def unbind(self, action: str, key: typing.Optional[int] = None):
+        """
+        Remove a key from an action. If no key is given, every key is removed from the action.
+        :param action: The name of the action.
+        :param key: The pygame key constant to remove.
+        """
+        if key is None:
+            self.__actions.pop(action, None)
+        elif key in self.__actions.get(action, []):
+            self.__actions[action].remove(key)
+
+    def get_bindings(self, action: str) -> typing.List[int]:
+        """
+        Get the keys that are bound to an action.
+        :param action: The name of the action.
+        :return: A list of pygame key constants.
+        """
+        return list(self.__actions.get(action, []))
+
+    def is_action_down(self, action: str) -> bool:
+        """
+        Is any key bound to an action being held down?
+        :param action: The name of the action.
+        :return: True if the action is down.
+        """
+        return any(self.is_key_down(key) for key in self.__actions.get(action, []))
+
+    def is_action_pressed(self, action: str) -> bool:
+        """
+        Was any key bound to an action pressed this frame?
+        :param action: The name of the action.
+        :return: True if the action was pressed.
+        """
+        return any(key in self.__keys_pressed for key in self.__actions.get(action, []))
+
+    def is_action_released(self, action: str) -> bool:
+        """
+        Was any key bound to an action released this frame?
+        :param action: The name of the action.
+        :return: True if the action was released.
+        """
+        return any(key in self.__keys_released for key in self.__actions.get(action, []))
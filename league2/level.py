@@ -0,0 +1,383 @@
+import pygame
+import numpy
+import threading
+import struct
+import mmap
+import json
+import base64
+import zlib
+import gzip
+import os
+import math
+import typing
+import league2.assets
+import league2.camera
+
+
+# The compiled level starts with a fixed header followed by the names of the layers. The tiles come next and are
+# stored one chunk at a time with every layer of a chunk next to each other. The object table is stored as JSON at
+# the very end since it is small compared to the tiles and only read once.
+_MAGIC = b'LG2L'
+_VERSION = 1
+_HEADER = struct.Struct('<4sIdIIIIIIIQQ')
+_NAME = struct.Struct('<H')
+# Tiled stores flipped and rotated tiles by setting the top bits of the tile id. League doesn't support them so
+# they are removed.
+_GID_MASK = 0x1FFFFFFF
+
+
+def _read_tiled_layer(layer):
+    data = layer['data']
+    if layer.get('encoding', 'csv') == 'base64':
+        raw = base64.b64decode(data)
+        if layer.get('compression') == 'zlib':
+            raw = zlib.decompress(raw)
+        elif layer.get('compression') == 'gzip':
+            raw = gzip.decompress(raw)
+        elif layer.get('compression', '') != '':
+            raise IOError('Unsupported level compression %s.' % layer['compression'])
+        return numpy.frombuffer(raw, dtype='<u4')
+    return numpy.array(data, dtype=numpy.uint32)
+
+
+def compile_level(source: str, target: str, chunk_size: int = 32):
+    """
+    Compile a level made in the Tiled map editor (saved as JSON) into the binary format used by League. The binary
+    format can be memory-mapped so it loads in the same amount of time no matter how big the level is. Usually
+    this is done automatically by Level when the compiled file is missing or out of date. Infinite maps, maps with
+    more than one tile-set and flipped or rotated tiles are not supported.
+    :param source: The Tiled JSON file to compile.
+    :param target: The file to write the compiled level to.
+    :param chunk_size: The width and height, in tiles, of each chunk that the level is split into.
+    """
+    f = open(source, 'r')
+    data = json.loads(f.read())
+    f.close()
+
+    if data.get('infinite', False):
+        raise IOError('Infinite Tiled maps are not supported, save the level with a fixed size.')
+    # A level is drawn with a single tile-sheet so the tile ids of a second tile-set would point at the wrong tiles.
+    if len(data.get('tilesets', [])) > 1:
+        raise IOError('Tiled maps with more than one tile-set are not supported, merge them into one.')
+    width = data['width']
+    height = data['height']
+    # Tile ids in Tiled start at one with zero meaning an empty cell. Subtracting the first id of the tile-set turns
+    # them into indices on a tile-sheet with empty cells becoming negative.
+    first_gid = data['tilesets'][0]['firstgid'] if data.get('tilesets') else 1
+
+    layers = []
+    names = []
+    objects = []
+    for layer in data['layers']:
+        if layer['type'] == 'tilelayer':
+            gids = (_read_tiled_layer(layer) & _GID_MASK).astype(numpy.int64)
+            tiles = numpy.where(gids == 0, -1, gids - first_gid)
+            layers.append(tiles.reshape(height, width))
+            names.append(layer['name'])
+        elif layer['type'] == 'objectgroup':
+            for obj in layer['objects']:
+                objects.append({
+                    'layer': layer['name'],
+                    'name': obj.get('name', ''),
+                    'type': obj.get('type', obj.get('class', '')),
+                    'rect': [obj['x'], obj['y'], obj.get('width', 0), obj.get('height', 0)],
+                    'properties': {p['name']: p['value'] for p in obj.get('properties', [])}
+                })
+
+    # Most tile-sheets are small enough for each tile to fit in two bytes which halves the size of the level.
+    largest = max([int(t.max()) for t in layers if t.size > 0] or [0])
+    dtype = numpy.dtype('<i2') if largest < 2 ** 15 else numpy.dtype('<i4')
+
+    # Pad the level so it divides evenly into chunks and then reorder it so that each chunk is contiguous.
+    chunks_x = math.ceil(width / chunk_size)
+    chunks_y = math.ceil(height / chunk_size)
+    grid = numpy.full((len(layers), chunks_y * chunk_size, chunks_x * chunk_size), -1, dtype=dtype)
+    for i, tiles in enumerate(layers):
+        grid[i, :height, :width] = tiles
+    grid = grid.reshape(len(layers), chunks_y, chunk_size, chunks_x, chunk_size).transpose(1, 3, 0, 2, 4)
+
+    encoded_names = b''.join(_NAME.pack(len(n.encode('utf-8'))) + n.encode('utf-8') for n in names)
+    tile_offset = _HEADER.size + len(encoded_names)
+    # Keep the tiles aligned so that they can be viewed directly from the memory map.
+    tile_offset += -tile_offset % 8
+    tile_bytes = numpy.ascontiguousarray(grid).tobytes()
+    object_bytes = json.dumps(objects).encode('utf-8')
+
+    header = _HEADER.pack(_MAGIC, _VERSION, os.path.getmtime(source), width, height, data['tilewidth'],
+                          data['tileheight'], chunk_size, dtype.itemsize, len(layers),
+                          tile_offset + len(tile_bytes), len(object_bytes))
+    f = open(target, 'wb')
+    f.write(header)
+    f.write(encoded_names)
+    f.write(b'\0' * (tile_offset - _HEADER.size - len(encoded_names)))
+    f.write(tile_bytes)
+    f.write(object_bytes)
+    f.close()
+
+
+def _read_header(fname):
+    f = open(fname, 'rb')
+    header = _HEADER.unpack(f.read(_HEADER.size))
+    f.close()
+    return header
+
+
+class Level:
+    """
+    A level loaded from a compiled level file. The level is memory-mapped rather than read into memory so opening
+    a level takes the same amount of time no matter how big it is. The level is split into square chunks and a
+    background thread keeps the chunks around a focus point (usually the player) in memory while forgetting the
+    chunks that are far away.
+    """
+    def __init__(self, source: str, cache: typing.Optional[str] = None, chunk_size: int = 32):
+        """
+        Open a level. If the source is a Tiled JSON file, it will be compiled into the cache folder first unless a
+        compiled version that is newer than the source already exists.
+        :param source: A Tiled JSON file.
+        :param cache: The folder to store compiled levels in. Defaults to the folder the source is in.
+        :param chunk_size: The width and height, in tiles, of each chunk. The level is compiled again if the
+        compiled version used a different chunk size.
+        """
+        if cache is None:
+            cache = os.path.dirname(os.path.realpath(source))
+        compiled = os.path.join(cache, os.path.splitext(os.path.basename(source))[0] + '.lvl')
+        # The compiled level remembers when the source was changed so that edits to the level are picked up.
+        header = _read_header(compiled) if os.path.isfile(compiled) else None
+        if header is None or header[1] != _VERSION or header[2] != os.path.getmtime(source) or \
+                header[7] != chunk_size:
+            compile_level(source, compiled, chunk_size)
+
+        magic, version, mtime, self.__width, self.__height, self.__tile_width, self.__tile_height, \
+            self.__chunk_size, itemsize, self.__layer_count, self.__object_offset, self.__object_size = \
+            _read_header(compiled)
+        if magic != _MAGIC:
+            raise IOError('%s is not a compiled level.' % compiled)
+
+        self.__file = open(compiled, 'rb')
+        self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__names = []
+        offset = _HEADER.size
+        for i in range(self.__layer_count):
+            length = _NAME.unpack_from(self.__map, offset)[0]
+            offset += _NAME.size
+            self.__names.append(bytes(self.__map[offset:offset + length]).decode('utf-8'))
+            offset += length
+        self.__objects = None
+
+        self.__chunks_x = math.ceil(self.__width / self.__chunk_size)
+        self.__chunks_y = math.ceil(self.__height / self.__chunk_size)
+        shape = (self.__chunks_y, self.__chunks_x, self.__layer_count, self.__chunk_size, self.__chunk_size)
+        dtype = numpy.dtype('<i2') if itemsize == 2 else numpy.dtype('<i4')
+        # This is only a view of the memory map so nothing is read from disk until a tile is looked at.
+        self.__tiles = numpy.frombuffer(self.__map, dtype=dtype, count=int(numpy.prod(shape)),
+                                        offset=offset + (-offset % 8)).reshape(shape)
+
+        self.__resident = {}
+        self.__radius = 2
+        self.__focus = None
+        self.__wake = threading.Event()
+        self.__closed = False
+        self.__thread = None
+
+    def __stream(self):
+        while True:
+            self.__wake.wait()
+            self.__wake.clear()
+            if self.__closed:
+                return
+            focus = self.__focus
+            wanted = set()
+            for cy in range(max(0, focus[1] - self.__radius), min(self.__chunks_y, focus[1] + self.__radius + 1)):
+                for cx in range(max(0, focus[0] - self.__radius), min(self.__chunks_x, focus[0] + self.__radius + 1)):
+                    wanted.add((cx, cy))
+            # Copying a chunk out of the memory map forces it to be read from disk here instead of on the main thread
+            # the first time one of its tiles is drawn.
+            resident = dict((key, chunk) for key, chunk in self.__resident.items() if key in wanted)
+            for cx, cy in wanted:
+                if (cx, cy) not in resident:
+                    resident[(cx, cy)] = numpy.array(self.__tiles[cy, cx])
+            # Swapping the whole dictionary means the main thread never sees it half updated.
+            self.__resident = resident
+
+    def set_focus(self, position: typing.Union[pygame.Vector2, typing.Tuple[float, float]]):
+        """
+        Tell the level where the player is so that the chunks around them are streamed in. The first call starts the
+        streaming thread.
+        :param position: The position in world pixels.
+        """
+        chunk = (int(position[0] // (self.__tile_width * self.__chunk_size)),
+                 int(position[1] // (self.__tile_height * self.__chunk_size)))
+        if chunk == self.__focus:
+            return
+        self.__focus = chunk
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__stream, daemon=True)
+            self.__thread.start()
+        self.__wake.set()
+
+    def set_stream_radius(self, radius: int):
+        """
+        Set how many chunks around the focus chunk are kept in memory in each direction.
+        :param radius: The number of chunks.
+        """
+        self.__radius = radius
+        if self.__focus is not None:
+            self.__wake.set()
+
+    def get_stream_radius(self) -> int:
+        """
+        How many chunks around the focus chunk are kept in memory in each direction?
+        :return: The number of chunks.
+        """
+        return self.__radius
+
+    def is_chunk_resident(self, cx: int, cy: int) -> bool:
+        """
+        Has a chunk been streamed into memory?
+        :param cx: The column of the chunk.
+        :param cy: The row of the chunk.
+        :return: True if the chunk is in memory.
+        """
+        return (cx, cy) in self.__resident
+
+    def get_resident_count(self) -> int:
+        """
+        How many chunks are currently streamed into memory?
+        :return: The number of chunks.
+        """
+        return len(self.__resident)
+
+    def close(self):
+        """
+        Stop streaming and close the compiled level file. The level can't be used afterwards.
+        """
+        self.__closed = True
+        self.__wake.set()
+        if self.__thread is not None:
+            self.__thread.join()
+        self.__resident = {}
+        self.__tiles = None
+        self.__map.close()
+        self.__file.close()
+
+    def get_size(self) -> typing.Tuple[int, int]:
+        """
+        Get the size of the level in tiles.
+        :return: The width and height as a tuple.
+        """
+        return self.__width, self.__height
+
+    def get_tile_size(self) -> typing.Tuple[int, int]:
+        """
+        Get the size of a single tile in pixels.
+        :return: The width and height as a tuple.
+        """
+        return self.__tile_width, self.__tile_height
+
+    def get_chunk_size(self) -> int:
+        """
+        Get the width and height of a chunk in tiles.
+        :return: The number of tiles along each side of a chunk.
+        """
+        return self.__chunk_size
+
+    def get_layer_names(self) -> typing.List[str]:
+        """
+        Get the names of the tile layers from back to front.
+        :return: A list of layer names.
+        """
+        return list(self.__names)
+
+    def get_layer_index(self, name: str) -> int:
+        """
+        Find the index of a tile layer from its name.
+        :param name: The name given to the layer in Tiled.
+        :return: The index of the layer.
+        """
+        return self.__names.index(name)
+
+    def get_chunk(self, layer: int, cx: int, cy: int) -> numpy.ndarray:
+        """
+        Get the tiles of one layer of a chunk. Chunks that have not been streamed in are copied straight out of the
+        compiled file which may be slow the first time. The copy means that the array stays valid after close().
+        :param layer: The index of the layer.
+        :param cx: The column of the chunk.
+        :param cy: The row of the chunk.
+        :return: A chunk size by chunk size array of tile indices indexed by row then column.
+        """
+        chunk = self.__resident.get((cx, cy))
+        if chunk is None:
+            return numpy.array(self.__tiles[cy, cx, layer])
+        return chunk[layer]
+
+    def get_tile(self, layer: int, x: int, y: int) -> int:
+        """
+        Get the index of the tile at a position. Indices refer to tiles on a tile-sheet where the index is
+        row * columns + column.
+        :param layer: The index of the layer.
+        :param x: The column of the tile.
+        :param y: The row of the tile.
+        :return: The tile index or -1 if the cell is empty or outside of the level.
+        """
+        if x < 0 or y < 0 or x >= self.__width or y >= self.__height:
+            return -1
+        cx, cy = x // self.__chunk_size, y // self.__chunk_size
+        chunk = self.__resident.get((cx, cy))
+        # A single tile is read from the memory map directly rather than copying its whole chunk.
+        if chunk is None:
+            return int(self.__tiles[cy, cx, layer, y % self.__chunk_size, x % self.__chunk_size])
+        return int(chunk[layer, y % self.__chunk_size, x % self.__chunk_size])
+
+    def get_objects(self) -> typing.List[dict]:
+        """
+        Get all the objects placed in the level. Each object is a dictionary with a layer, name, type, rect (in
+        pixels) and a dictionary of custom properties.
+        :return: A list of objects.
+        """
+        if self.__objects is None:
+            start = self.__object_offset
+            self.__objects = json.loads(bytes(self.__map[start:start + self.__object_size]).decode('utf-8'))
+        return self.__objects
+
+
+class LevelLayer(league2.camera.Layer):
+    """
+    A camera layer that draws one of the tile layers of a level using the tiles of a tile-sheet.
+    """
+    def __init__(self, level: Level, layer: int, tilesheet: league2.assets.TileSheet):
+        """
+        Create a new layer that draws part of a level.
+        :param level: The level to draw.
+        :param layer: The index of the tile layer to draw.
+        :param tilesheet: The tile-sheet that the level's tiles come from.
+        """
+        self.__level = level
+        self.__layer = layer
+        self.__tilesheet = tilesheet
+
+    def render(self, surface: pygame.Surface, rect: pygame.Rect, world: pygame.Rect):
+        tile_width, tile_height = self.__level.get_tile_size()
+        width, height = self.__level.get_size()
+        size = self.__level.get_chunk_size()
+        cols = self.__tilesheet.get_max_columns()
+        first_col = max(0, world.left // tile_width)
+        first_row = max(0, world.top // tile_height)
+        last_col = min(width - 1, (world.right - 1) // tile_width)
+        last_row = min(height - 1, (world.bottom - 1) // tile_height)
+        old_clip = surface.get_clip()
+        surface.set_clip(rect)
+        blits = []
+        for row in range(first_row, last_row + 1):
+            y = rect.top + row * tile_height - world.top
+            col = first_col
+            while col <= last_col:
+                # Walk along the row one chunk at a time so the chunk only has to be looked up once.
+                chunk = self.__level.get_chunk(self.__layer, col // size, row // size)[row % size]
+                end = min(last_col, (col // size + 1) * size - 1)
+                for index, c in zip(chunk[col % size:end % size + 1].tolist(), range(col, end + 1)):
+                    if index >= 0:
+                        blits.append((self.__tilesheet.get_tile(index // cols, index % cols),
+                                      (rect.left + c * tile_width - world.left, y)))
+                col = end + 1
+        surface.blits(blits, False)
+        surface.set_clip(old_clip)
@@ -0,0 +1,164 @@
+import pygame
+import numpy
+import typing
+
+
+class ParticleEmitter:
+    """
+    Emits and draws a large number of small particles for effects such as explosions, sparks and smoke. Particles
+    are not objects. Instead their positions, velocities and ages are kept in fixed size arrays that are updated all
+    at once each frame. When the emitter is full, the oldest particles are replaced by new ones.
+    """
+    def __init__(self, capacity: int, color: pygame.Color = pygame.Color(255, 255, 255),
+                 image: typing.Optional[pygame.Surface] = None):
+        """
+        Create a new particle emitter.
+        :param capacity: The most particles that can be alive at the same time.
+        :param color: The colour of each particle when drawn as a single pixel.
+        :param image: An optional surface to draw for each particle instead of a single pixel.
+        """
+        self.__capacity = capacity
+        self.__color = color
+        self.__image = image
+        self.__gravity = numpy.zeros(2, dtype=numpy.float32)
+        self.__next = 0
+        self.__positions = numpy.zeros((capacity, 2), dtype=numpy.float32)
+        self.__velocities = numpy.zeros((capacity, 2), dtype=numpy.float32)
+        self.__ages = numpy.zeros(capacity, dtype=numpy.float32)
+        # Particles start out dead by having no life left.
+        self.__lives = numpy.zeros(capacity, dtype=numpy.float32)
+        # Scratch arrays are made once so that updating and drawing don't have to allocate memory every frame.
+        self.__step = numpy.zeros((capacity, 2), dtype=numpy.float32)
+        self.__alive = numpy.zeros(capacity, dtype=bool)
+        self.__visible = numpy.zeros(capacity, dtype=bool)
+        self.__inside = numpy.zeros(capacity, dtype=bool)
+        self.__shift = numpy.zeros(2, dtype=numpy.float32)
+        self.__pixels = numpy.zeros((capacity, 2), dtype=numpy.int32)
+        self.__points = numpy.zeros((capacity, 2), dtype=numpy.int32)
+
+    def set_gravity(self, gravity: typing.Union[pygame.Vector2, typing.Tuple[float, float]]):
+        """
+        Set the acceleration applied to every particle.
+        :param gravity: The acceleration in pixels per second squared.
+        """
+        self.__gravity[:] = gravity
+
+    def set_color(self, color: pygame.Color):
+        """
+        Set the colour of the particles when they are drawn as single pixels.
+        :param color: The colour to draw with.
+        """
+        self.__color = color
+
+    def set_image(self, image: typing.Optional[pygame.Surface]):
+        """
+        Set the surface drawn for each particle. Pass None to draw single pixels instead.
+        :param image: The surface to draw for each particle.
+        """
+        self.__image = image
+
+    def get_capacity(self) -> int:
+        """
+        How many particles can be alive at the same time?
+        :return: The number of particles.
+        """
+        return self.__capacity
+
+    def count(self) -> int:
+        """
+        How many particles are alive right now?
+        :return: The number of particles.
+        """
+        numpy.less(self.__ages, self.__lives, out=self.__alive)
+        return int(numpy.count_nonzero(self.__alive))
+
+    def emit(self, count: int, position: typing.Union[pygame.Vector2, typing.Tuple[float, float]],
+             speed: typing.Tuple[float, float] = (20.0, 100.0), angle: typing.Tuple[float, float] = (0.0, 360.0),
+             life: typing.Tuple[float, float] = (0.5, 1.5)):
+        """
+        Create new particles at a position flying outwards in random directions. Each of the ranges picks a random
+        value between its minimum and maximum for every particle.
+        :param count: How many particles to create.
+        :param position: Where the particles start.
+        :param speed: The minimum and maximum speed in pixels per second.
+        :param angle: The minimum and maximum direction in degrees.
+        :param life: The minimum and maximum number of seconds that a particle lives for.
+        """
+        count = min(count, self.__capacity)
+        # New particles are written over the oldest ones like a ring buffer which is why no search for free space
+        # is needed.
+        slots = (self.__next + numpy.arange(count)) % self.__capacity
+        self.__next = (self.__next + count) % self.__capacity
+        directions = numpy.radians(numpy.random.uniform(angle[0], angle[1], count))
+        speeds = numpy.random.uniform(speed[0], speed[1], count)
+        self.__positions[slots] = position
+        self.__velocities[slots, 0] = numpy.cos(directions) * speeds
+        self.__velocities[slots, 1] = -numpy.sin(directions) * speeds
+        self.__ages[slots] = 0
+        self.__lives[slots] = numpy.random.uniform(life[0], life[1], count)
+
+    def clear(self):
+        """
+        Kill every particle right away.
+        """
+        self.__lives.fill(0)
+
+    def update(self, frame_time: float):
+        """
+        Move every particle and age it. This should be called once per frame.
+        :param frame_time: The time, in seconds, that the last frame took.
+        """
+        numpy.multiply(self.__gravity, frame_time, out=self.__step[0])
+        self.__velocities += self.__step[0]
+        numpy.multiply(self.__velocities, frame_time, out=self.__step)
+        self.__positions += self.__step
+        self.__ages += frame_time
+
+    def render(self, surface: pygame.Surface,
+               offset: typing.Union[pygame.Vector2, typing.Tuple[float, float]] = (0, 0)):
+        """
+        Draw every living particle. Without an image, particles are written straight into the surface's pixels
+        which is the fastest way to draw a lot of them. With an image, every particle is drawn with a single call
+        to Surface.blits(). Surfaces with 24-bit pixels are drawn to through a slower three dimensional pixel array.
+        :param surface: The surface to draw to, usually Application.get_surface().
+        :param offset: Subtracted from each particle's position, for example the position of the camera.
+        """
+        numpy.less(self.__ages, self.__lives, out=self.__alive)
+        # Images are centred on their particle so they are shifted by half their size. Single pixels are one by one.
+        size = (1, 1) if self.__image is None else self.__image.get_size()
+        self.__shift[0] = offset[0] + size[0] // 2
+        self.__shift[1] = offset[1] + size[1] // 2
+        numpy.subtract(self.__positions, self.__shift, out=self.__step)
+        numpy.floor(self.__step, out=self.__step)
+        numpy.copyto(self.__pixels, self.__step, casting='unsafe')
+
+        # Only draw particles that are alive and at least partly on the surface.
+        width, height = surface.get_size()
+        visible = self.__visible
+        inside = self.__inside
+        numpy.copyto(visible, self.__alive)
+        numpy.greater(self.__pixels[:, 0], -size[0], out=inside)
+        visible &= inside
+        numpy.greater(self.__pixels[:, 1], -size[1], out=inside)
+        visible &= inside
+        numpy.less(self.__pixels[:, 0], width, out=inside)
+        visible &= inside
+        numpy.less(self.__pixels[:, 1], height, out=inside)
+        visible &= inside
+        # The visible particles are packed into the front of a scratch array instead of a new one.
+        points = self.__points[:numpy.count_nonzero(visible)]
+        numpy.compress(visible, self.__pixels, axis=0, out=points)
+
+        if self.__image is not None:
+            image = self.__image
+            surface.blits([(image, p) for p in points.tolist()], False)
+        elif surface.get_bytesize() == 3:
+            # A pixel can't be written as a single integer on 24-bit surfaces so each channel is set instead.
+            pixels = pygame.surfarray.pixels3d(surface)
+            pixels[points[:, 0], points[:, 1]] = tuple(surface.unmap_rgb(surface.map_rgb(self.__color)))[:3]
+            del pixels
+        else:
+            pixels = pygame.surfarray.pixels2d(surface)
+            pixels[points[:, 0], points[:, 1]] = surface.map_rgb(self.__color)
+            # The surface stays locked until the pixel array is deleted.
+            del pixels
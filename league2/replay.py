@@ -0,0 +1,120 @@
+import pygame
+import gzip
+import json
+import os
+import typing
+
+
+# Replays are gzipped text with one JSON array per frame. The first line is a header so that old replays can be
+# recognised if the format ever changes.
+_FORMAT = 'league2-replay'
+_VERSION = 1
+
+
+def _encode_value(value):
+    if isinstance(value, (bool, int, float, str)) or value is None:
+        return value
+    if isinstance(value, (tuple, list)) or hasattr(value, '__iter__'):
+        return [_encode_value(v) for v in value]
+    # Anything else, such as a window handle, can't be replayed anyway.
+    return None
+
+
+class Recorder:
+    """
+    Writes the input of every frame and how long the frame took to a replay file. The application uses this when
+    recording is turned on with Application.record().
+    """
+    def __init__(self, fname: str):
+        """
+        Create a new replay file. An existing file with the same name is overwritten.
+        :param fname: The file to write the replay to.
+        """
+        self.__file = gzip.open(fname, 'wt', encoding='utf-8')
+        self.__file.write(json.dumps({'format': _FORMAT, 'version': _VERSION}) + '\n')
+
+    def write(self, frame_time: float, events: typing.List[pygame.event.Event], screen_mouse: typing.Tuple[int, int],
+              mouse: pygame.Vector2):
+        """
+        Add a frame to the replay.
+        :param frame_time: The time, in seconds, that the frame took.
+        :param events: The events that were taken from the queue this frame.
+        :param screen_mouse: The position of the mouse in the window.
+        :param mouse: The position of the mouse in the game's coordinates.
+        """
+        encoded = [[e.type, dict((k, _encode_value(v)) for k, v in e.dict.items())] for e in events]
+        frame = [frame_time, encoded, list(screen_mouse), [mouse.x, mouse.y]]
+        self.__file.write(json.dumps(frame, separators=(',', ':')) + '\n')
+
+    def close(self):
+        """
+        Finish writing the replay.
+        """
+        self.__file.close()
+
+
+class Playback:
+    """
+    Reads a replay file one frame at a time. Iterating over a playback gives the frame time, the events and the
+    mouse position of each recorded frame.
+    """
+    def __init__(self, fname: str):
+        """
+        Open a replay file.
+        :param fname: The file that the replay was recorded to.
+        """
+        self.__fname = fname
+        f = gzip.open(fname, 'rt', encoding='utf-8')
+        header = json.loads(f.readline())
+        f.close()
+        if header.get('format') != _FORMAT or header.get('version') != _VERSION:
+            raise IOError('%s is not a supported replay file.' % fname)
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple[float, typing.List[pygame.event.Event],
+                                                       typing.Tuple[typing.Tuple[int, int], pygame.Vector2]]]:
+        f = gzip.open(self.__fname, 'rt', encoding='utf-8')
+        f.readline()
+        for line in f:
+            frame_time, encoded, screen_mouse, mouse = json.loads(line)
+            events = [pygame.event.Event(t, d) for t, d in encoded]
+            yield frame_time, events, (tuple(screen_mouse), pygame.Vector2(mouse))
+        f.close()
+
+
+def summarize(timings: typing.List[float]) -> typing.Dict[str, float]:
+    """
+    Summarize the frame timings returned by a replay so that two runs can be compared.
+    :param timings: The time, in seconds, that each frame took to process.
+    :return: The number of frames along with the mean, median, 95th percentile and slowest frame time in seconds.
+    """
+    if len(timings) == 0:
+        return {'frames': 0, 'mean': 0.0, 'median': 0.0, 'p95': 0.0, 'max': 0.0}
+    ordered = sorted(timings)
+    return {
+        'frames': len(ordered),
+        'mean': sum(ordered) / len(ordered),
+        'median': ordered[len(ordered) // 2],
+        'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'max': ordered[-1]
+    }
+
+
+def replay(app: typing.Type['league2.Application'], settings: 'league2.Settings', fname: str,
+           frame_time: typing.Optional[float] = None) -> typing.List[float]:
+    """
+    Play a recorded session back without a window and as fast as possible. This is meant for measuring performance
+    since the same frames can be played back before and after a change to the engine or game. It must be called
+    before league2.init() since it has to pick the video driver.
+    :param app: The class to instantiate and run.
+    :param settings: The settings to create the game with.
+    :param fname: The replay file that was recorded with Application.record().
+    :param frame_time: A fixed frame time, in seconds, to use for every frame. By default each frame uses the frame
+    time that was recorded for it.
+    :return: The time, in seconds, that each frame took to process.
+    """
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    pygame.init()
+    timings = app(settings).replay(fname, frame_time)
+    pygame.quit()
+    return timings
@@ -0,0 +1,211 @@
+import pygame
+import abc
+import typing
+import league2.assets
+
+
+class Scene(abc.ABC):
+    """
+    A scene is a single level or screen of the game such as a menu, a level or a pause screen. Scenes are kept on
+    a stack by the scene manager and only the scene on top of the stack is updated and drawn. Each scene lists the
+    assets that it needs so that they can be loaded in the background before the scene is shown.
+    """
+    def __init__(self):
+        """
+        Create a new scene. It does nothing until it is given to the scene manager.
+        """
+        self.__manager = None
+
+    def get_manager(self) -> 'SceneManager':
+        """
+        Get the scene manager that this scene belongs to.
+        :return: The scene manager or None if the scene has not been shown yet.
+        """
+        return self.__manager
+
+    def set_manager(self, manager: typing.Optional['SceneManager']):
+        """
+        Called by the scene manager when the scene is added to or removed from it.
+        :param manager: The scene manager that owns this scene.
+        """
+        self.__manager = manager
+
+    def get_required_assets(self) -> typing.List[str]:
+        """
+        The names of the assets that this scene needs. They will be loaded in the background before the scene is
+        shown. Assets that the scene manager had to load are released once no scene on the stack needs them
+        anymore, while assets that were already loaded, for example when every asset is loaded at startup, are
+        kept.
+        :return: A list of asset names (without the extension).
+        """
+        return []
+
+    def on_enter(self):
+        """
+        Called when the scene is shown for the first time. All the required assets are loaded by this point.
+        """
+        pass
+
+    def on_exit(self):
+        """
+        Called when the scene is removed from the stack.
+        """
+        pass
+
+    def on_pause(self):
+        """
+        Called when another scene is pushed on top of this one.
+        """
+        pass
+
+    def on_resume(self):
+        """
+        Called when the scene on top of this one is popped and this scene is shown again.
+        """
+        pass
+
+    @abc.abstractmethod
+    def on_update(self, frame_time: float):
+        """
+        Called each frame while the scene is on top of the stack to update its state.
+        :param frame_time: The time, in seconds, that the last frame took.
+        """
+        pass
+
+    @abc.abstractmethod
+    def on_draw(self, surface: pygame.Surface, frame_time: float):
+        """
+        Called each frame while the scene is on top of the stack to draw it.
+        :param surface: The game's surface to draw to.
+        :param frame_time: The time, in seconds, that the last frame took.
+        """
+        pass
+
+
+class SceneManager:
+    """
+    Keeps a stack of scenes and switches between them. Switching scenes does not happen right away. Instead, the
+    assets of the next scene are loaded in the background while the current scene keeps running and the switch
+    happens on the first frame after everything is ready. Assets that were loaded for the old scene and that nothing
+    else on the stack needs are released after the switch.
+    """
+    PUSH = 'push'
+    POP = 'pop'
+    REPLACE = 'replace'
+
+    def __init__(self, assets: league2.assets.AssetManager):
+        """
+        Create a new, empty scene manager.
+        :param assets: The asset manager that scenes load their assets through.
+        """
+        self.__assets = assets
+        self.__stack = []
+        self.__pending = []
+        # Only the assets that were loaded because a scene asked for them are released again. Anything loaded by
+        # the game itself could still be in use outside of the scenes.
+        self.__owned = set()
+
+    def __get_needed(self, scenes):
+        needed = set()
+        for scene in scenes:
+            needed.update(scene.get_required_assets())
+        return needed
+
+    def __is_ready(self, scene):
+        return all(self.__assets.is_loaded(name) for name in scene.get_required_assets())
+
+    def __queue(self, action, scene):
+        if scene is not None:
+            self.preload(scene)
+        self.__pending.append((action, scene))
+
+    def preload(self, scene: Scene):
+        """
+        Start loading the assets of a scene in the background without switching to it. This is useful to get the
+        next level ready long before it is needed.
+        :param scene: The scene to load the assets of.
+        """
+        self.__owned.update(self.__assets.load(scene.get_required_assets()))
+
+    def push(self, scene: Scene):
+        """
+        Show a new scene on top of the current one. The current scene is paused but keeps its assets.
+        :param scene: The scene to show once its assets are loaded.
+        """
+        self.__queue(SceneManager.PUSH, scene)
+
+    def pop(self):
+        """
+        Remove the current scene and go back to the one below it.
+        """
+        self.__queue(SceneManager.POP, None)
+
+    def replace(self, scene: Scene):
+        """
+        Swap the current scene for a new one. This is the usual way to move from one level to the next.
+        :param scene: The scene to show once its assets are loaded.
+        """
+        self.__queue(SceneManager.REPLACE, scene)
+
+    def get_scene(self) -> typing.Optional[Scene]:
+        """
+        Get the scene that is currently being shown.
+        :return: The scene on top of the stack or None if there are no scenes.
+        """
+        return self.__stack[-1] if len(self.__stack) > 0 else None
+
+    def is_transitioning(self) -> bool:
+        """
+        Is the manager waiting to switch to another scene?
+        :return: True if a switch has been asked for and hasn't happened yet.
+        """
+        return len(self.__pending) > 0
+
+    def __transition(self):
+        # Transitions happen in the order they were asked for, but a transition to a new scene has to wait until
+        # all of that scene's assets are loaded. The current scene keeps running in the meantime.
+        while len(self.__pending) > 0:
+            action, scene = self.__pending[0]
+            if scene is not None and not self.__is_ready(scene):
+                return
+            self.__pending.pop(0)
+
+            removed = []
+            if action == SceneManager.PUSH:
+                if len(self.__stack) > 0:
+                    self.__stack[-1].on_pause()
+            elif len(self.__stack) > 0:
+                removed.append(self.__stack.pop())
+                removed[-1].on_exit()
+                removed[-1].set_manager(None)
+
+            if scene is not None:
+                self.__stack.append(scene)
+                scene.set_manager(self)
+                scene.on_enter()
+            elif len(self.__stack) > 0:
+                self.__stack[-1].on_resume()
+
+            # Only release what no scene on the stack or waiting to be shown still needs.
+            needed = self.__get_needed(self.__stack + [s for a, s in self.__pending if s is not None])
+            unneeded = (self.__get_needed(removed) - needed) & self.__owned
+            self.__owned -= unneeded
+            self.__assets.release(list(unneeded))
+
+    def update(self, frame_time: float):
+        """
+        Switch scenes if one is ready and update the current scene. This is called by the application each frame.
+        :param frame_time: The time, in seconds, that the last frame took.
+        """
+        self.__transition()
+        if len(self.__stack) > 0:
+            self.__stack[-1].on_update(frame_time)
+
+    def draw(self, surface: pygame.Surface, frame_time: float):
+        """
+        Draw the current scene. This is called by the application each frame.
+        :param surface: The game's surface to draw to.
+        :param frame_time: The time, in seconds, that the last frame took.
+        """
+        if len(self.__stack) > 0:
+            self.__stack[-1].on_draw(surface, frame_time)